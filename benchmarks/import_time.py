@@ -0,0 +1,80 @@
+# ==========================================
+# IMPORT-TIME GUARD
+# Imports each pipeline module in a fresh interpreter and checks that
+#   - no model/agent framework module (autogen, ollama, httpx, tiktoken)
+#     is loaded, i.e. nothing is built at import (create_agents is lazy)
+#   - the best of --repeat imports stays under --budget-ms
+# Exits 1 on a violation, so it can run in CI.
+#
+#   python benchmarks/import_time.py
+#   python benchmarks/import_time.py --budget-ms 150 --repeat 5
+# ==========================================
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "config",
+    "create_agents",
+    "cascade",
+    "intra_group_debate_ner",
+    "intra_group_debate_re",
+    "gazetteer",
+    "segmentation",
+    "corpus",
+]
+HEAVY_PREFIXES = ("autogen_agentchat", "autogen_core", "autogen_ext", "ollama", "httpx", "tiktoken")
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted({{m.split('.')[0] for m in sys.modules if m.startswith({heavy!r})}})
+print(json.dumps({{"ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+
+def probe(module: str) -> dict:
+    out = subprocess.check_output(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_PREFIXES)], cwd=ROOT, text=True,
+    )
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="max import time per module")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh imports per module (best is kept)")
+    parser.add_argument("--reference", action="store_true",
+                        help="also time autogen_agentchat.agents for comparison")
+    args = parser.parse_args()
+
+    modules = MODULES + (["autogen_agentchat.agents"] if args.reference else [])
+    failures = []
+    print(f"{'module':<28}{'best ms':>9}  heavy modules loaded")
+    for module in modules:
+        runs = [probe(module) for _ in range(max(1, args.repeat))]
+        best = min(r["ms"] for r in runs)
+        heavy = runs[0]["heavy"]
+        print(f"{module:<28}{best:>9.1f}  {', '.join(heavy) or '-'}")
+        if module not in MODULES:
+            continue
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+        if best > args.budget_ms:
+            failures.append(f"{module} took {best:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print(f"\nOK: all imports under {args.budget_ms:.0f} ms, no framework modules loaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# ==========================================
+# JSON EXTRACTION MICRO-BENCHMARK
+# Times the shared extractor (json_extract.first_json_array /
+# last_json_object) against the regex parsers the pipelines used before,
+# on recorded model outputs: a replay log (config.replay_mode = "record")
+# or mock recordings, i.e. any JSONL with a "content" field.  Without
+# --recordings a synthetic set is used.  --think-chars wraps every output
+# in a deepseek-r1 style <think> block of that length.
+#
+#   python benchmarks/json_extract_bench.py --recordings runs/replay.jsonl.gz --think-chars 4000
+# ==========================================
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import json_extract
+from replay_log import ReplayLog
+
+
+# ---------------------
+# Previous parsers (reference)
+# ---------------------
+_codefence_re = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
+_json_array_re = re.compile(r"\[[\s\S]*?\]")
+_json_object_re = re.compile(r"\{[\s\S]*\}")
+
+
+def _strip_wrappers(text):
+    t = text.strip()
+    m = _codefence_re.search(t)
+    return m.group(1).strip() if m else t.replace("`", "").strip()
+
+
+def _loads_or_quotes(s):
+    try:
+        return json.loads(s)
+    except ValueError:
+        try:
+            return json.loads(s.replace("'", '"'))
+        except ValueError:
+            return None
+
+
+def old_first_array(text):
+    # NER parse_json_block, then RE find_first_json_array
+    try:
+        data = json.loads(text.strip())
+        if isinstance(data, list):
+            return data
+    except ValueError:
+        pass
+    m = re.search(r"\[.*\]", text, re.S)
+    if m:
+        try:
+            data = json.loads(m.group(0))
+            if isinstance(data, list):
+                return data
+        except ValueError:
+            pass
+    m = _json_array_re.search(_strip_wrappers(text))
+    return _loads_or_quotes(m.group(0)) if m else None
+
+
+def old_last_object(text):
+    # NER parse_final_json, then RE find_last_json_object
+    try:
+        return json.loads(text.strip().split("\n")[-1].strip())
+    except ValueError:
+        pass
+    m = re.search(r"\{[\s\S]*?\}", text)
+    if m:
+        try:
+            return json.loads(m.group(0))
+        except ValueError:
+            pass
+    matches = list(_json_object_re.finditer(_strip_wrappers(text)))
+    return _loads_or_quotes(matches[-1].group(0)) if matches else None
+
+
+# ---------------------
+# Inputs
+# ---------------------
+SYNTHETIC = [
+    '[{"span": "Arjun", "confidence": 0.9}, {"span": "Maple Town", "confidence": 0.7}]',
+    '```json\n[{"head": "Arjun", "relation": "Live-in", "tail": "Maple Town", "confidence": 0.8}]\n```',
+    'The sentence says Arjun [the engineer] works there.\n{"span": "Arjun", "type": "PER"}',
+    'Both agents agree.\n{"head": "Rina", "relation": "Work-for", "tail": "Daily Echo"}',
+    "[{'span': 'BrightTech', 'confidence': 0.8}]",
+    "[]",
+]
+_THINK_WORDS = ("maybe", "the", "entity", "[PER]", "{type}", "relation", "or", "LOC?", "\"quoted\"", "so")
+
+
+def think_block(n_chars, rng):
+    words = []
+    while sum(len(w) + 1 for w in words) < n_chars:
+        words.append(rng.choice(_THINK_WORDS))
+    return "<think>\n" + " ".join(words) + "\n</think>\n\n"
+
+
+def load_outputs(path):
+    if not path:
+        return list(SYNTHETIC)
+    return [e["content"] for e in ReplayLog(path).entries() if e.get("content")]
+
+
+def bench(fn, outputs, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in outputs:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(outputs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recordings", help="JSONL (optionally .gz) with a content field per line")
+    parser.add_argument("--think-chars", type=int, default=0, help="prepend a <think> block of this size")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    outputs = load_outputs(args.recordings)
+    if args.think_chars:
+        outputs = [think_block(args.think_chars, rng) + text for text in outputs]
+    avg_chars = sum(map(len, outputs)) / len(outputs)
+    print(f"{len(outputs)} outputs, {avg_chars:.0f} chars on average, "
+          f"decoder: {json_extract._loads.__module__}\n")
+
+    cases = [
+        ("first array", old_first_array, json_extract.first_json_array),
+        ("last object", old_last_object, json_extract.last_json_object),
+    ]
+    print(f"{'parser':<14}{'old µs':>9}{'new µs':>9}{'speedup':>9}{'differ':>8}")
+    for name, old, new in cases:
+        old_us = bench(old, outputs, args.rounds)
+        new_us = bench(new, outputs, args.rounds)
+        differ = sum(old(t) != new(t) for t in outputs)
+        print(f"{name:<14}{old_us:>9.1f}{new_us:>9.1f}{old_us / new_us:>8.1f}x{differ:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+# ==========================================
+# MOCK OLLAMA SERVER
+# A local stand-in for Ollama's /api/chat (streaming NDJSON or single
+# JSON) so the pipelines can be benchmarked without models.
+#
+# Answers come from, in order:
+#   1. recordings: a replay log written with config.replay_mode = "record"
+#      (replay_log.py, .gz allowed); entries are matched on their
+#      wire_key, i.e. model + role/content of every request message
+#   2. a synthetic responder that reads the agent from the system prompt
+#      and the entities/relations from the synthetic corpus text
+#
+# Latency: log-normal time to first chunk (median_ms, sigma) plus
+# chunk_ms per streamed chunk.  A `malformed` share of answers is broken
+# JSON or prose.  `conflict_density` is the share of entities / pairs that
+# a second agent also claims with a close confidence, so it drives debates.
+# Model swaps: at most `max_loaded` models stay loaded.  Like Ollama, a
+# call for another model waits until a loaded model has no call in flight,
+# evicts it and pays `load_ms` (loads are serialized).
+# /api/generate with an empty prompt loads (or, with keep_alive=0,
+# unloads) a model, like Ollama.  options.num_predict cuts answers longer
+# than that many tokens (~4 chars each) with done_reason "length".
+# Per model: `latency_factor` scales its latency (a fast small model) and
+# `low_confidence` is the share of its extraction answers whose claims all
+# come back with confidence 0.4 (what a cascade escalates).
+#
+#   python benchmarks/mock_ollama.py --port 11435     # serve standalone
+# ==========================================
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay_log import ReplayLog, wire_key
+from synthetic_corpus import ENTITY_TYPES, find_entities, find_relations
+
+RELATIONS = ("Kill", "Live-in", "Work-for", "Located-in", "OrgBasedIn")
+
+
+def load_recordings(path: Optional[str]) -> Dict[str, str]:
+    """wire_key → recorded answer from a replay log (the first answer per key)."""
+    recordings = {}
+    if path:
+        for entry in ReplayLog(path).entries():
+            if entry.get("wire_key"):
+                recordings.setdefault(entry["wire_key"], entry["content"])
+    return recordings
+
+
+def _fraction(*parts: str) -> float:
+    """Deterministic value in [0, 1) for `parts` (stable across runs)."""
+    digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+# ---------------------
+# Synthetic responder
+# ---------------------
+def classify_agent(system: str) -> str:
+    if "PERSON-NER" in system:
+        return "PER"
+    if "LOCATION-NER" in system:
+        return "LOC"
+    if "ORGANIZATION-NER" in system:
+        return "ORG"
+    if "NER debate summarizer" in system:
+        return "NER_Summarizer"
+    if "summarizer for relation debates" in system:
+        return "RE_Summarizer"
+    if "for ALL of these relations" in system:
+        return "Joint_RE"
+    role_line = next((line for line in system.splitlines() if line.startswith("You are")), "")
+    for rel in RELATIONS:
+        if f'"{rel}"' in role_line:
+            return rel
+    return "unknown"
+
+
+def _between(text: str, start: str, end: str) -> Optional[str]:
+    i = text.find(start)
+    if i == -1:
+        return None
+    i += len(start)
+    j = text.find(end, i)
+    return text[i:j] if j != -1 else None
+
+
+class SyntheticResponder:
+    def __init__(self, conflict_density: float = 0.2, seed: int = 0):
+        self.conflict_density = conflict_density
+        self.seed = str(seed)
+
+    def _conflicted(self, *parts: str) -> bool:
+        return _fraction(self.seed, *parts) < self.conflict_density
+
+    def respond(self, agent: str, messages: List[Dict[str, Any]]) -> str:
+        conversation = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") != "system")
+
+        span = _between(conversation, 'CONFLICT DETECTED for entity span: "', '"') \
+            or _between(conversation, 'Span: ', "\n")
+        if agent in ("PER", "LOC", "ORG", "NER_Summarizer") and span \
+                and ("CONFLICT DETECTED" in conversation or agent == "NER_Summarizer"):
+            verdict = {"span": span, "type": ENTITY_TYPES.get(span, "PER")}
+            return f"The sentence uses {span} as a {verdict['type']}.\n{json.dumps(verdict)}"
+
+        head = _between(conversation, 'Head: "', '"') or _between(conversation, "Head: ", "\n")
+        tail = _between(conversation, 'Tail: "', '"') or _between(conversation, "Tail: ", "\n")
+        if head and tail:
+            truth = {(h, t): r for h, r, t in find_relations(conversation)}
+            verdict = {"head": head, "relation": truth.get((head, tail), "no_relation"), "tail": tail}
+            return f"The wording supports {verdict['relation']}.\n{json.dumps(verdict)}"
+
+        if agent in ("PER", "LOC", "ORG"):
+            claims = []
+            for ent, ent_type in find_entities(conversation):
+                if ent_type == agent:
+                    claims.append({"span": ent, "confidence": 0.85})
+                elif self._conflicted("ner", ent):
+                    claims.append({"span": ent, "confidence": 0.7})
+            return json.dumps(claims)
+
+        if agent in RELATIONS or agent == "Joint_RE":
+            sentence = _between(conversation, "Sentence: ", "\n") or conversation
+            triples = []
+            for h, rel, t in find_relations(sentence):
+                if agent in (rel, "Joint_RE"):
+                    triples.append({"head": h, "relation": rel, "tail": t, "confidence": 0.9})
+                    if agent == "Joint_RE" and self._conflicted("re", h, t):
+                        other = RELATIONS[int(_fraction(self.seed, h, t) * len(RELATIONS))]
+                        if other != rel:
+                            triples.append({"head": h, "relation": other, "tail": t, "confidence": 0.8})
+                elif self._conflicted("re", h, t) and \
+                        agent == RELATIONS[int(_fraction(self.seed, h, t) * len(RELATIONS))]:
+                    triples.append({"head": h, "relation": agent, "tail": t, "confidence": 0.8})
+            return json.dumps(triples)
+
+        return "[]"
+
+
+def malform(content: str, rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return content[: max(1, len(content) // 2)]            # truncated JSON
+    return "I think the answer is clear from the sentence, but I cannot format it."
+
+
+# ---------------------
+# HTTP server
+# ---------------------
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, host: str = "127.0.0.1", recordings: Optional[Dict[str, str]] = None,
+                 median_ms: float = 50.0, sigma: float = 0.5, chunk_ms: float = 0.0, chunk_chars: int = 16,
+                 malformed: float = 0.0, conflict_density: float = 0.2, seed: int = 0,
+                 load_ms: float = 0.0, max_loaded: int = 1, latency_factor: Optional[Dict[str, float]] = None,
+                 low_confidence: Optional[Dict[str, float]] = None):
+        super().__init__((host, port), _Handler)
+        self.recordings = recordings or {}
+        self.responder = SyntheticResponder(conflict_density, seed)
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.chunk_ms = chunk_ms
+        self.chunk_chars = max(1, chunk_chars)
+        self.malformed = malformed
+        self.latency_factor = latency_factor or {}
+        self.low_confidence = low_confidence or {}
+        self.low_confidence_sent = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.replayed = 0
+        self.malformed_sent = 0
+        self.load_ms = load_ms
+        self.max_loaded = max(1, max_loaded)
+        self.loaded: List[str] = []          # least recently used first
+        self.loads = 0
+        self.active = Counter()              # calls in flight per model
+        self.loading: Optional[str] = None
+        self.models = threading.Condition()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockOllamaServer":
+        threading.Thread(target=self.serve_forever, name="mock-ollama", daemon=True).start()
+        return self
+
+    def acquire_model(self, model: str) -> float:
+        """Waits until `model` is loaded (loading it if needed); returns the load time."""
+        with self.models:
+            while True:
+                if model in self.loaded and self.loading != model:
+                    self.loaded.remove(model)
+                    self.loaded.append(model)
+                    self.active[model] += 1
+                    return 0.0
+                if self.loading is None:
+                    idle = [m for m in self.loaded if not self.active[m]]
+                    if len(self.loaded) < self.max_loaded or idle:
+                        if len(self.loaded) >= self.max_loaded:
+                            self.loaded.remove(idle[0])
+                        self.loading = model
+                        break
+                self.models.wait()
+        time.sleep(self.load_ms / 1000)
+        with self.models:
+            self.loads += 1
+            self.loaded.append(model)
+            self.loading = None
+            self.active[model] += 1
+            self.models.notify_all()
+        return self.load_ms / 1000
+
+    def release_model(self, model: str) -> None:
+        with self.models:
+            self.active[model] -= 1
+            self.models.notify_all()
+
+    def unload(self, model: str) -> None:
+        with self.models:
+            if model in self.loaded and not self.active[model]:
+                self.loaded.remove(model)
+                self.models.notify_all()
+
+    def answer(self, model: str, messages: List[Dict[str, Any]]):
+        system = next((str(m.get("content", "")) for m in messages if m.get("role") == "system"), "")
+        agent = classify_agent(system)
+        key = wire_key(model, messages)
+        with self.lock:
+            self.calls[agent] += 1
+            delay = self.median_ms / 1000 * math.exp(self.sigma * self.rng.gauss(0, 1))
+            delay *= self.latency_factor.get(model, 1.0)
+            broken = self.rng.random() < self.malformed
+            unsure = self.rng.random() < self.low_confidence.get(model, 0.0)
+            if key in self.recordings:
+                self.replayed += 1
+                return self.recordings[key], delay
+            content = self.responder.respond(agent, messages)
+            if unsure and content.startswith("[{"):
+                self.low_confidence_sent += 1
+                content = json.dumps([dict(c, confidence=0.4) for c in json.loads(content)])
+            if broken:
+                self.malformed_sent += 1
+                content = malform(content, self.rng)
+        return content, delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": sum(self.calls.values()), "by_agent": dict(self.calls),
+                "replayed": self.replayed, "malformed": self.malformed_sent,
+                "low_confidence": self.low_confidence_sent, "model_loads": self.loads}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, obj: Any, status: int = 200):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path in ("/", "/api/version"):
+            self._send_json({"version": "mock"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": []})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "")
+        if self.path == "/api/generate" and not request.get("prompt"):
+            if request.get("keep_alive") in (0, "0", "0s"):
+                self.server.unload(model)
+                load = 0.0
+            else:
+                load = self.server.acquire_model(model)
+                self.server.release_model(model)
+            self._send_json({"model": model, "created_at": datetime.now(timezone.utc).isoformat(),
+                             "response": "", "done": True, "done_reason": "load",
+                             "load_duration": int(load * 1e9)})
+            return
+        if self.path != "/api/chat":
+            self._send_json({"error": "not found"}, 404)
+            return
+
+        messages = request.get("messages", [])
+        content, delay = self.server.answer(model, messages)
+        self.server.acquire_model(model)
+        try:
+            self._respond(request, model, messages, content, delay)
+        finally:
+            self.server.release_model(model)
+
+    def _respond(self, request, model, messages, content, delay):
+        time.sleep(delay)
+
+        done_reason = "stop"
+        num_predict = (request.get("options") or {}).get("num_predict")
+        if num_predict and num_predict > 0 and len(content) > num_predict * 4:
+            content = content[:num_predict * 4]
+            done_reason = "length"
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        base = {"model": model, "created_at": datetime.now(timezone.utc).isoformat()}
+        final = dict(base, message={"role": "assistant", "content": ""}, done=True, done_reason=done_reason,
+                     prompt_eval_count=prompt_tokens, eval_count=max(1, len(content) // 4))
+
+        if not request.get("stream", True):
+            final["message"]["content"] = content
+            self._send_json(final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        step = self.server.chunk_chars
+        try:
+            for i in range(0, len(content), step):
+                if self.server.chunk_ms:
+                    time.sleep(self.server.chunk_ms / 1000)
+                self._chunk(dict(base, message={"role": "assistant", "content": content[i:i + step]}, done=False))
+            self._chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # client stopped reading (early stop / cancellation)
+
+    def _chunk(self, obj: Dict[str, Any]):
+        line = (json.dumps(obj) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--recordings", help="replay log (config.replay_path) to answer from")
+    parser.add_argument("--median-ms", type=float, default=50.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--chunk-ms", type=float, default=0.0)
+    parser.add_argument("--malformed", type=float, default=0.0)
+    parser.add_argument("--conflict-density", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--load-ms", type=float, default=0.0, help="model load (swap) time")
+    parser.add_argument("--max-loaded", type=int, default=1, help="models kept loaded at once")
+    args = parser.parse_args()
+
+    server = MockOllamaServer(args.port, recordings=load_recordings(args.recordings), median_ms=args.median_ms,
+                              sigma=args.sigma, chunk_ms=args.chunk_ms, malformed=args.malformed,
+                              conflict_density=args.conflict_density, seed=args.seed,
+                              load_ms=args.load_ms, max_loaded=args.max_loaded)
+    print(f"mock Ollama on {server.url}")
+    server.serve_forever()
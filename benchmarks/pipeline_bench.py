@@ -0,0 +1,230 @@
+# ==========================================
+# OFFLINE PIPELINE BENCHMARK
+# Drives run_intra_group_ner_pipeline → run_intra_group_debate_re over
+# synthetic corpora against the mock Ollama server (mock_ollama.py), so
+# pipeline overhead can be measured and compared across commits without
+# models.  Reports throughput, p50/p95/p99 document latency, model calls
+# and peak memory for every (corpus size, conflict density) combination.
+#
+#   python benchmarks/pipeline_bench.py --docs 20 100 --conflict-density 0 0.3 \
+#       --malformed 0.05 --out bench.jsonl
+#
+# --cascade runs extraction small-model-first (cascade.py);
+# --compare-cascade runs every case without and with it and prints the
+# end-to-end savings, e.g. with --fast-factor 0.3 --fast-low-confidence 0.1
+# --max-loaded 2 (a cascade needs both models resident).
+#
+# Every result line carries the git commit and all parameters; append
+# runs from several commits to one --out file to compare them.
+# ==========================================
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import resource
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from cascade import CascadeStats, cascade_stats
+from mock_ollama import MockOllamaServer, load_recordings
+from synthetic_corpus import generate_corpus
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def role_stats():
+    import create_agents
+    return create_agents.get_client_registry().role_stats()
+
+
+async def run_corpus_bench(docs, concurrency: int):
+    # Imported after config points at the mock server
+    from intra_group_debate_ner import run_intra_group_ner_pipeline
+    from intra_group_debate_re import run_intra_group_debate_re
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors, relations = [], 0, 0
+
+    async def one(text):
+        nonlocal errors, relations
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ents = await run_intra_group_ner_pipeline(text)
+                rels = await run_intra_group_debate_re(text, ents)
+                relations += len(rels)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in docs))
+    return time.perf_counter() - started, latencies, errors, relations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, nargs="+", default=[20, 100], help="corpus sizes")
+    parser.add_argument("--sentences", type=int, default=4, help="sentences per document")
+    parser.add_argument("--conflict-density", type=float, nargs="+", default=[0.0, 0.3])
+    parser.add_argument("--malformed", type=float, default=0.05, help="share of broken answers")
+    parser.add_argument("--median-ms", type=float, default=20.0, help="median time to first chunk")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal latency spread")
+    parser.add_argument("--chunk-ms", type=float, default=0.0, help="delay per streamed chunk")
+    parser.add_argument("--concurrency", type=int, default=8, help="documents in flight")
+    parser.add_argument("--recordings", help="replay log (config.replay_path) served before synthetic answers")
+    parser.add_argument("--rss", action="store_true",
+                        help="report the process max RSS (cumulative over cases) instead of the "
+                             "per-case Python heap peak (tracemalloc, slower)")
+    parser.add_argument("--load-ms", type=float, default=0.0, help="mock model load (swap) time")
+    parser.add_argument("--max-loaded", type=int, default=1, help="models the mock keeps loaded at once")
+    parser.add_argument("--mixed-models", action="store_true",
+                        help="debates and summarizers on config.model2, extraction on config.model1")
+    parser.add_argument("--affinity", action="store_true", help="enable config.model_affinity")
+    parser.add_argument("--cascade", action="store_true", help="enable config.cascade_enabled")
+    parser.add_argument("--compare-cascade", action="store_true",
+                        help="run every case without and with the cascade and print the savings")
+    parser.add_argument("--fast-factor", type=float, default=1.0, help="mock latency factor of config.model2")
+    parser.add_argument("--fast-low-confidence", type=float, default=0.0,
+                        help="share of config.model2 extraction answers with low confidence")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="append result lines (JSONL) to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    config.response_cache_enabled = False   # measure the pipeline, not the cache
+    config.memo_enabled = False
+    config.trace_path = None
+    config.model_affinity = args.affinity
+    cascade_modes = [False, True] if args.compare_cascade else [args.cascade]
+    if args.mixed_models:
+        config.role_models = dict(config.role_models, debate=config.model2, summarizer=config.model2)
+
+    server = MockOllamaServer(
+        recordings=load_recordings(args.recordings), median_ms=args.median_ms, sigma=args.sigma,
+        chunk_ms=args.chunk_ms, malformed=args.malformed, seed=args.seed, load_ms=args.load_ms,
+        max_loaded=args.max_loaded, latency_factor={config.model2: args.fast_factor},
+        low_confidence={config.model2: args.fast_low_confidence},
+    ).start()
+    config.ollama_hosts = [server.url]
+    config.host = server.url
+
+    commit = git_commit()
+    print(f"commit {commit}, mock Ollama at {server.url}\n")
+
+    # One untimed document pays for the lazy pipeline imports and client
+    # construction, so they do not land in the first case's latencies
+    asyncio.run(run_corpus_bench(generate_corpus(1, args.sentences, seed=args.seed + 1), 1))
+    peak_label = "max RSS MB" if args.rss else "peak MB"
+    print(f"{'docs':>6}{'conflict':>9}{'docs/s':>9}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+          f"{'calls':>7}{'calls/doc':>10}{'loads':>7}{'errors':>7}{peak_label:>11}")
+
+    for density in args.conflict_density:
+        for n_docs in args.docs:
+            runs = {}
+            for cascade in cascade_modes:
+                config.cascade_enabled = cascade
+                server.responder.conflict_density = density
+                server.calls.clear()
+                server.malformed_sent = server.replayed = server.loads = server.low_confidence_sent = 0
+                docs = generate_corpus(n_docs, args.sentences, seed=args.seed)
+
+                roles_before = role_stats()
+                for pipeline_stats in cascade_stats.values():
+                    pipeline_stats.reset()
+                if not args.rss:
+                    tracemalloc.start()
+                wall, latencies, errors, relations = asyncio.run(run_corpus_bench(docs, args.concurrency))
+                if args.rss:
+                    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                else:
+                    peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                    tracemalloc.stop()
+
+                stats = server.stats()
+                roles = {}
+                for role, after in role_stats().items():
+                    before = roles_before.get(role, {})
+                    roles[role] = {k: v - before.get(k, 0) for k, v in after.items() if k != "model"}
+                result = {
+                    "commit": commit,
+                    "docs": n_docs,
+                    "sentences": args.sentences,
+                    "conflict_density": density,
+                    "malformed": args.malformed,
+                    "median_ms": args.median_ms,
+                    "sigma": args.sigma,
+                    "concurrency": args.concurrency,
+                    "seed": args.seed,
+                    "load_ms": args.load_ms,
+                    "max_loaded": args.max_loaded,
+                    "mixed_models": args.mixed_models,
+                    "affinity": args.affinity,
+                    "cascade": cascade,
+                    "fast_factor": args.fast_factor,
+                    "fast_low_confidence": args.fast_low_confidence,
+                    "wall_s": round(wall, 3),
+                    "docs_per_s": round(n_docs / wall, 3),
+                    "p50_s": round(percentile(latencies, 0.50), 4),
+                    "p95_s": round(percentile(latencies, 0.95), 4),
+                    "p99_s": round(percentile(latencies, 0.99), 4),
+                    "calls": stats["calls"],
+                    "calls_by_agent": stats["by_agent"],
+                    "malformed_sent": stats["malformed"],
+                    "low_confidence_sent": stats["low_confidence"],
+                    "replayed": stats["replayed"],
+                    "model_loads": stats["model_loads"],
+                    "roles": roles,
+                    "cascade_stats": {p: c.as_dict() for p, c in cascade_stats.items()} if cascade else None,
+                    "errors": errors,
+                    "relations": relations,
+                    "peak_mb": round(peak_mb, 1),
+                    "peak_kind": "max_rss_cumulative" if args.rss else "python_heap",
+                }
+                print(f"{n_docs:>6}{density:>9.2f}{result['docs_per_s']:>9.2f}{result['p50_s']:>8.3f}"
+                      f"{result['p95_s']:>8.3f}{result['p99_s']:>8.3f}{stats['calls']:>7}"
+                      f"{stats['calls'] / n_docs:>10.1f}{stats['model_loads']:>7}{errors:>7}{result['peak_mb']:>11.1f}"
+                      f"{'  cascade' if cascade else ''}")
+                for role, r in sorted(roles.items()):
+                    print(f"{'':>6}  {role:<11} calls {r['calls']:>5}  truncated {r['truncated']:>4}  "
+                          f"tokens {r['prompt_tokens']:>7} in / {r['completion_tokens']:>6} out")
+                for pipeline, c in (result["cascade_stats"] or {}).items():
+                    escalated = ", ".join(f"{k} {c[k]}" for k in CascadeStats.OUTCOMES[1:] if c[k])
+                    print(f"{'':>6}  cascade {pipeline:<4} calls {c['calls']:>5}  escalated "
+                          f"{c['escalation_rate']:>6.1%} ({escalated or '-'})  mean call {c['fast_mean_s']} s fast / "
+                          f"{c['large_mean_s']} s large")
+                if args.out:
+                    with open(args.out, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(result) + "\n")
+                runs[cascade] = result
+            if len(runs) == 2:
+                off, on = runs[False], runs[True]
+                print(f"{'':>6}  cascade saves p50 {off['p50_s'] - on['p50_s']:+.3f} s, "
+                      f"p95 {off['p95_s'] - on['p95_s']:+.3f} s, docs/s x{on['docs_per_s'] / off['docs_per_s']:.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# ==========================================
+# RE MODE COMPARISON: per-relation agents vs. joint call
+# Runs run_intra_group_debate_re over a fixed set of sentences with
+# known entities, once per mode, and reports wall time, token usage and
+# how far the two modes agree on the final triples.
+#
+# Runs offline by default: the mock Ollama server (mock_ollama.py)
+# answers over seeded synthetic sentences, which compares the two modes'
+# call overhead and token usage.  --live runs the fixed sample sentences
+# against the Ollama hosts and models from config.py instead, which also
+# makes the agreement figures meaningful.  The response cache and
+# the debate memo are switched off so both modes do real work:
+#   python benchmarks/re_joint_vs_per_relation.py [--live] [--pair-mode] [--rounds N]
+# ==========================================
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from mock_ollama import MockOllamaServer
+from synthetic_corpus import find_entities, generate_corpus
+
+
+def ents(**typed):
+    return [{"span": span, "type": t, "confidence": 1.0} for t, spans in typed.items() for span in spans]
+
+
+SAMPLES = [
+    ("Arjun lived in Maple Town with his sister Rina.",
+     ents(PER=["Arjun", "Rina"], LOC=["Maple Town"])),
+    ("Every morning, Arjun worked in BrightTech, an organization based in Silver City.",
+     ents(PER=["Arjun"], ORG=["BrightTech"], LOC=["Silver City"])),
+    ("Rina worked for the local news group Daily Echo.",
+     ents(PER=["Rina"], ORG=["Daily Echo"])),
+    ("A criminal named Victor was killed by Officer Arjun near the Old Bridge inside North Valley.",
+     ents(PER=["Victor", "Arjun"], LOC=["Old Bridge", "North Valley"])),
+    ("Daily Echo announced that their main office is located in Central Plaza.",
+     ents(ORG=["Daily Echo"], LOC=["Central Plaza"])),
+    ("Rina later moved to Pine Town, which is inside North Valley, but still worked for Daily Echo.",
+     ents(PER=["Rina"], LOC=["Pine Town", "North Valley"], ORG=["Daily Echo"])),
+    ("Arjun also visited Lakeview Park, which is located in Greenhill, after finishing his duty.",
+     ents(PER=["Arjun"], LOC=["Lakeview Park", "Greenhill"])),
+]
+
+
+def synthetic_samples(n: int, seed: int = 0):
+    """One-sentence synthetic documents with their gold entities (for the mock)."""
+    return [(text, [{"span": span, "type": t, "confidence": 1.0} for span, t in find_entities(text)])
+            for text in generate_corpus(n, 1, filler_ratio=0.0, seed=seed)]
+
+
+def model_clients():
+    import create_agents
+    return {id(c): c for c in (create_agents.client_registry.client_for_role(r) for r in config.role_models)}.values()
+
+
+def usage():
+    prompt = completion = 0
+    for client in model_clients():
+        u = client.total_usage()
+        prompt += u.prompt_tokens
+        completion += u.completion_tokens
+    return prompt, completion
+
+
+def triples(relations):
+    return {(r.get("head"), r.get("relation"), r.get("tail")) for r in relations if isinstance(r, dict)}
+
+
+async def run_mode(samples, joint: bool, pair_mode: bool, rounds: int):
+    # Imported after config points at the mock server
+    from intra_group_debate_re import run_intra_group_debate_re
+
+    prompt0, completion0 = usage()
+    started = time.perf_counter()
+    outputs = []
+    for _ in range(rounds):
+        for sentence, entities in samples:
+            rels = await run_intra_group_debate_re(sentence, entities, pair_mode=pair_mode, joint_mode=joint)
+            outputs.append(triples(rels))
+    elapsed = time.perf_counter() - started
+    prompt1, completion1 = usage()
+    return outputs, elapsed, prompt1 - prompt0, completion1 - completion0
+
+
+async def main(samples, pair_mode: bool, rounds: int):
+    per_rel = await run_mode(samples, False, pair_mode, rounds)
+    joint = await run_mode(samples, True, pair_mode, rounds)
+
+    n = len(per_rel[0])
+    print(f"{n} sentences, pair_mode={pair_mode}\n")
+    print(f"{'mode':<14}{'wall s':>9}{'s/sent':>9}{'prompt tok':>12}{'compl tok':>11}")
+    for name, (_, elapsed, prompt, completion) in (("per-relation", per_rel), ("joint", joint)):
+        print(f"{name:<14}{elapsed:>9.2f}{elapsed / n:>9.2f}{prompt:>12}{completion:>11}")
+
+    shared = sum(len(a & b) for a, b in zip(per_rel[0], joint[0]))
+    union = sum(len(a | b) for a, b in zip(per_rel[0], joint[0]))
+    exact = sum(a == b for a, b in zip(per_rel[0], joint[0]))
+    print(f"\nagreement: {shared}/{union} triples (jaccard {shared / union if union else 1.0:.2f}), "
+          f"{exact}/{n} sentences identical")
+    if per_rel[2]:
+        print(f"prompt tokens, joint / per-relation: {joint[2] / per_rel[2]:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pair-mode", action="store_true", help="combine both modes with re_pair_mode")
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the sample sentences")
+    parser.add_argument("--live", action="store_true", help="use the Ollama hosts from config.py")
+    parser.add_argument("--median-ms", type=float, default=50.0, help="mock median time to first chunk")
+    parser.add_argument("--conflict-density", type=float, default=0.2, help="mock conflict density")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    config.response_cache_enabled = False   # both modes must do real work
+    config.memo_enabled = False
+    config.trace_path = None
+    samples = SAMPLES
+    if not args.live:
+        samples = synthetic_samples(len(SAMPLES))
+        server = MockOllamaServer(median_ms=args.median_ms, conflict_density=args.conflict_density).start()
+        config.ollama_hosts = [server.url]
+        config.host = server.url
+        print(f"mock Ollama at {server.url}\n")
+    asyncio.run(main(samples, args.pair_mode, args.rounds))
@@ -0,0 +1,85 @@
+# ==========================================
+# SYNTHETIC CORPUS
+# Documents built from fixed entity pools and relation templates, so the
+# mock Ollama server can answer every agent from the text alone (see
+# mock_ollama.py).  Generation is seeded: the same arguments give the same
+# corpus on every commit.
+# ==========================================
+
+import re
+import random
+from typing import Dict, List, Tuple
+
+PERSONS = [
+    "Arjun", "Rina", "Victor", "Maya", "Tomas", "Leila", "Kenji", "Sofia", "Omar", "Hana",
+    "Diego", "Priya", "Lukas", "Amara", "Felix", "Nadia", "Ravi", "Elena", "Jonah", "Zara",
+]
+LOCATIONS = [
+    "Maple Town", "Silver City", "Greenhill", "North Valley", "Pine Town", "Central Plaza",
+    "Lakeview Park", "Old Bridge", "Silver District", "Harbor Point", "Stone Ridge", "Elm Grove",
+]
+ORGANIZATIONS = [
+    "BrightTech", "Daily Echo", "Nova Labs", "Redwood Bank", "Apex Foods", "Blue Harbor Press",
+    "Quantum Works", "Summit Health", "Iron Gate Security", "Crescent Airlines",
+]
+
+ENTITY_TYPES: Dict[str, str] = {
+    **{p: "PER" for p in PERSONS},
+    **{l: "LOC" for l in LOCATIONS},
+    **{o: "ORG" for o in ORGANIZATIONS},
+}
+
+# (relation, template, head pool, tail pool)
+TEMPLATES = [
+    ("Live-in", "{h} lives in {t}.", PERSONS, LOCATIONS),
+    ("Live-in", "{h} has made a home in {t}.", PERSONS, LOCATIONS),
+    ("Work-for", "{h} works for {t}.", PERSONS, ORGANIZATIONS),
+    ("Work-for", "{h} joined the staff of {t} last year.", PERSONS, ORGANIZATIONS),
+    ("OrgBasedIn", "{h} is headquartered in {t}.", ORGANIZATIONS, LOCATIONS),
+    ("Located-in", "{h} lies inside {t}.", LOCATIONS, LOCATIONS),
+    ("Kill", "{t} was killed by {h} near the river.", PERSONS, PERSONS),
+]
+FILLERS = [
+    "The weather stayed calm all week.",
+    "Nobody expected the news to spread so quickly.",
+    "Later that evening the streets were quiet again.",
+]
+
+_relation_patterns: List[Tuple[str, "re.Pattern"]] = []
+for _rel, _template, _, _ in TEMPLATES:
+    _pattern = re.escape(_template).replace(re.escape("{h}"), "(?P<h>[A-Z][\\w ]*?)")
+    _pattern = _pattern.replace(re.escape("{t}"), "(?P<t>[A-Z][\\w ]*?)")
+    _relation_patterns.append((_rel, re.compile(_pattern)))
+
+
+def find_entities(text: str) -> List[Tuple[str, str]]:
+    """(span, type) for every pool entity in `text`, in pool order."""
+    return [(span, t) for span, t in ENTITY_TYPES.items() if span in text]
+
+
+def find_relations(text: str) -> List[Tuple[str, str, str]]:
+    """(head, relation, tail) expressed by a template in `text`."""
+    found = []
+    for rel, pattern in _relation_patterns:
+        for m in pattern.finditer(text):
+            triple = (m.group("h"), rel, m.group("t"))
+            if triple not in found:
+                found.append(triple)
+    return found
+
+
+def generate_corpus(docs: int, sentences: int = 4, filler_ratio: float = 0.25, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(docs):
+        parts = []
+        for _ in range(sentences):
+            if rng.random() < filler_ratio:
+                parts.append(rng.choice(FILLERS))
+                continue
+            _, template, heads, tails = rng.choice(TEMPLATES)
+            h = rng.choice(heads)
+            t = rng.choice([x for x in tails if x != h])
+            parts.append(template.format(h=h, t=t))
+        corpus.append(" ".join(parts))
+    return corpus
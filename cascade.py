@@ -0,0 +1,143 @@
+# ==========================================
+# SMALL-MODEL-FIRST CASCADE
+# With config.cascade_enabled, every NER / RE extraction agent answers
+# first on the fast model (client roles "ner_fast" / "re_fast" in
+# config.role_models).  Its answer is re-asked of the large model (the
+# agent's usual client role) when
+#   - the call failed or timed out                         → "error"
+#   - the answer does not parse as a JSON list / object    → "parse"
+#   - a claim's confidence is below cascade_min_confidence → "confidence"
+#   - it is empty and cascade_escalate_empty is set        → "empty"
+# Otherwise the fast answer is kept ("accepted").  Conflicting spans and
+# pairs across agents still go to the resolution policy and debate.
+# ==========================================
+
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import config
+import create_agents
+from json_extract import first_json_array, last_json_object
+from metrics import cascade_calls, cascade_seconds, measured
+from structured_log import traced
+
+log = logging.getLogger(__name__)
+
+
+class CascadeStats:
+    """Outcomes and time per tier for one pipeline's cascaded calls."""
+
+    OUTCOMES = ("accepted", "error", "parse", "confidence", "empty")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.outcomes = {outcome: 0 for outcome in self.OUTCOMES}
+        self.fast_seconds = 0.0
+        self.large_seconds = 0.0
+
+    @property
+    def calls(self) -> int:
+        return sum(self.outcomes.values())
+
+    @property
+    def escalated(self) -> int:
+        return self.calls - self.outcomes["accepted"]
+
+    def escalation_rate(self) -> float:
+        return self.escalated / self.calls if self.calls else 0.0
+
+    def mean_seconds(self, tier: str) -> Optional[float]:
+        n = self.calls if tier == "fast" else self.escalated
+        return (self.fast_seconds if tier == "fast" else self.large_seconds) / n if n else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        fast_mean, large_mean = self.mean_seconds("fast"), self.mean_seconds("large")
+        return {
+            "calls": self.calls,
+            **self.outcomes,
+            "escalation_rate": round(self.escalation_rate(), 4),
+            "fast_seconds": round(self.fast_seconds, 3),
+            "large_seconds": round(self.large_seconds, 3),
+            "fast_mean_s": None if fast_mean is None else round(fast_mean, 4),
+            "large_mean_s": None if large_mean is None else round(large_mean, 4),
+        }
+
+
+cascade_stats = {"ner": CascadeStats(), "re": CascadeStats()}
+
+
+def extraction_claims(raw: str) -> Optional[List[Any]]:
+    """Claims in an extraction answer; None if it does not parse."""
+    claims = first_json_array(raw)
+    if claims is None:
+        obj = last_json_object(raw)
+        claims = [obj] if obj is not None else None
+    return claims
+
+
+def escalation_reason(result: Any, min_confidence: float = None) -> Optional[str]:
+    """Why a fast-model run result should be re-asked of the large model, or None."""
+    if isinstance(result, BaseException):
+        return "error"
+    raw = result.messages[-1].content if result.messages else ""
+    claims = extraction_claims(raw if isinstance(raw, str) else "")
+    if claims is None:
+        return "parse"
+    if not claims:
+        return "empty" if config.cascade_escalate_empty else None
+
+    threshold = config.cascade_min_confidence if min_confidence is None else min_confidence
+    for claim in claims:
+        if isinstance(claim, dict) and "confidence" in claim:
+            try:
+                if float(claim["confidence"]) < threshold:
+                    return "confidence"
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+async def _run_tier(role: str, client_role: Optional[str], task: str, stage: str, tier: str):
+    agent = create_agents.new_agent(role, client_role=client_role)
+    return await traced(
+        measured(agent.run(task=task), stage, agent.name, create_agents.model_for(role, client_role)),
+        "agent_call", role=role, tier=tier,
+    )
+
+
+async def run_cascaded(pipeline: str, role: str, task: str):
+    """
+    Runs `role`'s extraction agent on the fast model and, if needed, again
+    on the large one.  Returns the run result that counts; a failure of the
+    large-model call is raised like a plain agent.run().
+    """
+    stats = cascade_stats[pipeline]
+    fast_role = f"{pipeline}_fast"
+
+    started = time.perf_counter()
+    try:
+        result = await _run_tier(role, fast_role, task, f"{pipeline}_fanout", "fast")
+    except Exception as e:
+        result = e
+    elapsed = time.perf_counter() - started
+    stats.fast_seconds += elapsed
+    cascade_seconds.inc(elapsed, pipeline=pipeline, tier="fast")
+
+    reason = escalation_reason(result)
+    outcome = reason or "accepted"
+    stats.outcomes[outcome] += 1
+    cascade_calls.inc(pipeline=pipeline, outcome=outcome)
+    if reason is None:
+        return result
+
+    log.info("   ⤴️ Escalating %s to %s (%s)", role, create_agents.model_for(role), reason)
+    started = time.perf_counter()
+    try:
+        return await _run_tier(role, None, task, f"{pipeline}_escalation", "large")
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.large_seconds += elapsed
+        cascade_seconds.inc(elapsed, pipeline=pipeline, tier="large")
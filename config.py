@@ -1,54 +1,307 @@
-from autogen_ext.models.ollama import OllamaChatCompletionClient
-
 model1="deepseek-r1:8b"
 model2="llama3.2:latest"
 model3="llama3.2-vision:latest"
 
 host="http://localhost:11434"
 
-def get_model1_client():
+# Ollama endpoints requests are spread over (least outstanding requests
+# first). A host is ejected for host_eject_seconds after
+# host_eject_after_failures consecutive failed calls.
+ollama_hosts = [host]
+host_eject_after_failures = 3
+host_eject_seconds = 30.0
+
+# Model used by each agent role
+role_models = {
+    "ner": model1,
+    "re": model1,
+    "debate": model1,
+    "summarizer": model1,
+    # fast tier of the cascade (see cascade_enabled below)
+    "ner_fast": model2,
+    "re_fast": model2,
+}
+
+# Generation profile per agent role (same keys as role_models; debaters
+# use "debate", summarizers "summarizer"):
+#   think        reasoning on (True) / off (False) / model default (None);
+#                only for models that support it (deepseek-r1)
+#   num_predict  cap on generated tokens (stops runaway generations)
+#   stop         stop sequences
+#   num_ctx      context window; keep it equal for roles that share a
+#                model, Ollama reloads the model when it changes
+#   temperature
+# Missing or None keys keep the model's defaults.
+generation_profiles = {
+    "ner": {"think": False, "num_predict": 512, "num_ctx": 8192, "temperature": 0.0},
+    "re": {"think": False, "num_predict": 768, "num_ctx": 8192, "temperature": 0.0},
+    "debate": {"think": None, "num_predict": 2048, "num_ctx": 8192, "temperature": 0.2},
+    "summarizer": {"think": False, "num_predict": 1024, "num_ctx": 8192, "temperature": 0.0},
+    "ner_fast": {"think": None, "num_predict": 512, "num_ctx": 8192, "temperature": 0.0},
+    "re_fast": {"think": None, "num_predict": 768, "num_ctx": 8192, "temperature": 0.0},
+}
+
+model_info = {
+    "json_output": True,
+    "function_calling": False,
+    "vision": False,
+    "supports_image_input": False,
+    "supports_audio_input": False,
+    "supports_pdf_input": False,
+    "supports_stream": True,
+    "supports_tools": False}
+
+def make_ollama_client(model: str, host_url: str = host):
+    # One client per (host, model) keeps a pooled keep-alive HTTP connection.
+    # Imported here so that importing config stays cheap.
+    from autogen_ext.models.ollama import OllamaChatCompletionClient
     return OllamaChatCompletionClient(
-        model=model1,
-        host=host,
-        model_info={
-            "json_output": True,
-            "function_calling": False,
-            "vision": False,
-            "supports_image_input": False,
-            "supports_audio_input": False,
-            "supports_pdf_input": False,
-            "supports_stream": True,
-            "supports_tools": False}
+        model=model,
+        host=host_url,
+        model_info=dict(model_info)
     )
 
+def get_model1_client():
+    return make_ollama_client(model1)
+
 def get_model2_client():
-    return OllamaChatCompletionClient(
-        model=model2,
-        host=host,
-        model_info={
-            "json_output": True,
-            "function_calling": False,
-            "vision": False,
-            "supports_image_input": False,
-            "supports_audio_input": False,
-            "supports_pdf_input": False,
-            "supports_stream": True,
-            "supports_tools": False}
-    )
+    return make_ollama_client(model2)
 
 def get_model3_client():
-    return OllamaChatCompletionClient(
-        model=model3,
-        host=host,
-        model_info={
-            "json_output": True,
-            "function_calling": False,
-            "vision": False,
-            "supports_image_input": False,
-            "supports_audio_input": False,
-            "supports_pdf_input": False,
-            "supports_stream": True,
-            "supports_tools": False}
-    )
+    return make_ollama_client(model3)
+
+
+# -------------------------------
+# Pipeline concurrency
+# -------------------------------
+# Maximum number of NER span debates (and their summarizer fallbacks)
+# that may be in flight at the same time for one document.
+max_concurrent_debates = 4
+
+# Maximum number of LLM calls outstanding per model at once, shared by
+# every agent, debate and summarizer using that model (all documents).
+max_outstanding_calls = {
+    model1: 4,
+    model2: 4,
+    model3: 2,
+}
+default_max_outstanding_calls = 4
+
+# Documents processed at once by corpus.run_corpus().
+corpus_concurrency = 8
+
+# -------------------------------
+# Model affinity (model_clients.ModelAffinityScheduler)
+# On CPU-only / small-RAM hosts Ollama evicts and reloads models when
+# calls for different models interleave.  With model_affinity on, queued
+# calls are grouped by model: one model's queue is drained before
+# switching, switching waits until its in-flight calls finish, and the
+# next model is loaded with keep_alive before its calls are released
+# (the previous one is unloaded first if affinity_unload_previous).
+# affinity_max_batch bounds how many calls one model may start while
+# others wait (None = until its queue is empty).
+# -------------------------------
+model_affinity = False
+affinity_max_batch = 32
+affinity_keep_alive = "10m"
+affinity_unload_previous = True
+
+# -------------------------------
+# Small-model-first cascade (cascade.py)
+# NER / RE extraction agents answer first on role_models["ner_fast"] /
+# ["re_fast"]; an answer is re-asked of the large model (role_models["ner"]
+# / ["re"]) when the call fails, the answer does not parse, a claim's
+# confidence is below cascade_min_confidence, or, with
+# cascade_escalate_empty, when it holds no claims.  Conflicting spans and
+# pairs still go to the resolution policy and debate.
+# Combine with model_affinity when both models cannot stay loaded.
+# -------------------------------
+cascade_enabled = False
+cascade_min_confidence = 0.7
+cascade_escalate_empty = False
+
+# -------------------------------
+# Logging & trace (structured_log.py)
+# log_level / log_format ("text" or "json") apply when a script calls
+# structured_log.configure_logging(). trace_path = "trace.jsonl" appends one
+# JSON line per agent call, debate, verdict and document (None = off).
+# -------------------------------
+log_level = "INFO"
+log_format = "text"
+trace_path = None
+
+# -------------------------------
+# Metrics (metrics.py)
+# Stage/agent latency histograms, token and debate counters in Prometheus
+# text format. metrics_path: file rewritten by metrics.write_metrics_file()
+# (run_corpus writes it after every document); metrics_port: port for
+# metrics.start_metrics_server() (GET /metrics).
+# -------------------------------
+metrics_enabled = True
+metrics_path = None
+metrics_port = 9464
+
+# -------------------------------
+# Persistent response cache (SQLite)
+# Keyed on model + system message + task payload; least recently used
+# entries are evicted once the stored responses exceed max_bytes.
+# Set response_cache_enabled = False (or model_clients.response_cache.enabled
+# at runtime) to bypass it.
+# -------------------------------
+response_cache_enabled = True
+response_cache_path = ".cache/llm_responses.sqlite3"
+response_cache_max_bytes = 256 * 1024 * 1024
+
+# -------------------------------
+# Record / replay (replay_log.py)
+# "record": append every model call (NER, RE, debate turns, summarizers)
+# to replay_path.  "replay": answer every call from that file with no
+# model calls at all (a call that was not recorded raises ReplayMissError).
+# None = normal run.  A path ending in .gz is gzipped.
+# -------------------------------
+replay_mode = None
+replay_path = "runs/replay.jsonl.gz"
+
+# -------------------------------
+# In-flight request coalescing
+# Identical calls (same model, system message and payload) that are in
+# flight at the same time, e.g. boilerplate paragraphs shared by several
+# documents in a corpus run, share one model call.
+# -------------------------------
+coalesce_inflight = True
+
+# -------------------------------
+# Streaming early stop
+# Stream extraction calls (client roles in stream_early_stop_roles) and
+# cancel generation once a complete JSON array has been emitted. Debate
+# turns and summarizers are never cut: their decision is the last line.
+# -------------------------------
+stream_early_stop = True
+stream_early_stop_roles = ("ner", "re", "ner_fast", "re_fast")
+
+# -------------------------------
+# RE pair-targeted mode
+# Ask each relation agent only about type-valid (head, tail) pairs
+# (e.g. Work-for: PER -> ORG) and skip agents with no valid pair.
+# -------------------------------
+re_pair_mode = False
+
+# -------------------------------
+# RE joint mode
+# One agent extracts all five relation types in a single call; its output
+# is split into per-relation claims, so disagreements are still debated.
+# Combines with re_pair_mode (the agent then only sees type-valid pairs).
+# -------------------------------
+re_joint_mode = False
+
+# -------------------------------
+# Long-document segmentation (segmentation.py)
+# Documents longer than segment_min_chars are split into windows of
+# window_sentences sentences, consecutive windows sharing window_overlap.
+# Entities of the same type whose spans have a rapidfuzz ratio of at least
+# window_merge_threshold are merged across windows.
+# -------------------------------
+segment_documents = False
+segment_min_chars = 600
+window_sentences = 3
+window_overlap = 1
+window_merge_threshold = 90
+
+# -------------------------------
+# Gazetteer fast path (gazetteer.py)
+# Known entities (inline and/or a JSON file {"PER": [...], "LOC": [...],
+# "ORG": [...]}) and "<Title> Name" patterns (direct_resolve_titles) are
+# resolved without LLM
+# calls. A sentence skips the NER agents when every capitalized token is
+# explained, ignoring a sentence-initial word from common_capitalized.
+# -------------------------------
+gazetteer_enabled = False
+gazetteer_path = None
+gazetteer_entries = {
+    "PER": [],
+    "LOC": [],
+    "ORG": [],
+}
+honorific_titles = [
+    "Officer", "Detective", "Inspector", "Sergeant", "Captain", "Agent",
+    "Mr.", "Mrs.", "Ms.", "Miss", "Dr.", "Prof.", "Professor",
+    "President", "Senator", "Governor", "Mayor", "Judge", "General",
+]
+# Titles whose "<Title> Name" is resolved as PER without the agents. Other
+# honorific_titles also start non-person names (General Motors, Agent
+# Orange, President Street, Captain America) and are left to the agents.
+direct_resolve_titles = [
+    "Officer", "Detective", "Inspector", "Sergeant",
+    "Mr.", "Mrs.", "Ms.", "Dr.", "Prof.",
+]
+common_capitalized = {
+    "A", "An", "The", "This", "That", "These", "Those", "It", "He", "She",
+    "They", "We", "I", "His", "Her", "Their", "Our", "Its", "In", "On",
+    "At", "After", "Before", "During", "While", "When", "Later", "Then",
+    "Every", "Each", "One", "But", "And", "However", "Meanwhile", "Also",
+}
+
+# -------------------------------
+# Debate outcome memo (resolution_store.py)
+# Verdicts are keyed by normalized span / (head, tail) plus the
+# memo_context_tokens words around it. A stored verdict replaces a new
+# debate when its confidence reaches memo_min_confidence. Debate verdicts
+# score memo_debate_confidence; summarizer verdicts score
+# memo_summarizer_confidence.
+# -------------------------------
+memo_enabled = True
+memo_capacity = 50_000
+memo_ttl_seconds = 24 * 3600
+memo_context_tokens = 3
+memo_min_confidence = 0.75
+memo_debate_confidence = 1.0
+memo_summarizer_confidence = 0.8
+
+# -------------------------------
+# Debate skipping (resolution_policy.py)
+# A conflicting label wins without a debate when its best confidence
+# leads the runner-up by *_debate_skip_margin, or when
+# *_debate_skip_vote_lead more agents back it (repeated claims of one
+# agent count once). None turns a rule off; the vote rule is off because
+# each NER type / RE relation currently comes from a single agent.
+# -------------------------------
+ner_debate_skip_margin = 0.5
+ner_debate_skip_vote_lead = None
+re_debate_skip_margin = 0.5
+re_debate_skip_vote_lead = None
+
+# -------------------------------
+# Adaptive debate termination (debate_termination.py)
+# A debate stops once debate_agree_turns consecutive debater messages
+# carry a valid verdict with the same label; debate_max_turns caps it.
+# -------------------------------
+debate_agree_turns = 2
+debate_max_turns = 3
 
+# -------------------------------
+# Span clustering (span_clustering.py)
+# Before conflict resolution, NER spans that are equal after normalization
+# (case, honorific titles, leading articles) or whose rapidfuzz ratio
+# reaches span_merge_threshold are merged into one canonical span with
+# aliases, so they are resolved and paired in RE only once.
+# -------------------------------
+span_clustering_enabled = True
+span_merge_threshold = 90
 
+# -------------------------------
+# Timeouts & hedged retries (seconds; None disables a deadline)
+# agent_call_timeout bounds every single model call; debate_timeout and
+# summarizer_timeout bound a whole debate / summarizer run. On a missed
+# deadline the pipelines degrade: a timed-out extraction agent contributes
+# no claims, and a timed-out debate or summarizer falls through to the
+# highest-confidence claim.
+# With hedging on, a duplicate request is sent once a call runs longer
+# than the hedge_quantile latency of recent calls (after
+# hedge_min_samples successful calls); the first answer wins.
+# -------------------------------
+agent_call_timeout = 180.0
+debate_timeout = 600.0
+summarizer_timeout = 240.0
+hedge_enabled = False
+hedge_quantile = 0.95
+hedge_min_samples = 20
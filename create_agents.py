@@ -1,75 +1,222 @@
 # ==========================================
 # CREATE ALL AGENTS (NER + RE + DEBATE)
+# Nothing is built at import: model clients are created the first time a
+# model is used and agents on demand (new_agent / shared_agent), and the
+# autogen imports happen then too.  Importing the pipelines' parsing and
+# orchestration code stays cheap (benchmarks/import_time.py guards it).
 # ==========================================
 
 from prompt_templates.ner import ner_prompts
 from prompt_templates.re import re_prompts
 from prompt_templates.ner import debate_summarizer_prompt_ner
 from prompt_templates.re import debate_summarizer_prompt_re
-from autogen_agentchat.agents import AssistantAgent
+from typing import TYPE_CHECKING
+
 import config
+from replay_log import ReplayLog
+
+if TYPE_CHECKING:
+    from autogen_agentchat.agents import AssistantAgent
 
 
 # -------------------------------
 # Load the base model
+# Responses are served from the persistent cache when possible; misses
+# are capped per model (config.max_outstanding_calls) across all agents,
+# debates and documents, and streamed with early stop once the JSON
+# verdict is complete (config.stream_early_stop).  Each call has a
+# deadline and optional hedged retry (config.agent_call_timeout, hedge_*).
+# With config.model_affinity, calls are grouped by model so Ollama does not
+# swap models between them (waiting calls hold no per-model slot).
+# With config.replay_mode every call is recorded to, or answered from,
+# config.replay_path (see replay_log.py).
 # -------------------------------
-model_client_ollama = config.get_model2_client()
-model_client_deepseek = config.get_model1_client()
+_replay_log = None
+
+
+def get_replay_log() -> ReplayLog:
+    global _replay_log
+    if _replay_log is None:
+        _replay_log = ReplayLog(config.replay_path)
+    return _replay_log
+
+
+def wrap_model_client(client, model: str):
+    from model_clients import (
+        AffinityChatCompletionClient,
+        CachedChatCompletionClient,
+        DeadlineChatCompletionClient,
+        EarlyStopChatCompletionClient,
+        LimitedChatCompletionClient,
+        RecordingChatCompletionClient,
+        ReplayChatCompletionClient,
+        SingleFlightChatCompletionClient,
+    )
+
+    if config.replay_mode == "replay":
+        return ReplayChatCompletionClient(client, get_replay_log(), model)
+    if config.stream_early_stop:
+        client = EarlyStopChatCompletionClient(client, model)
+    client = DeadlineChatCompletionClient(
+        client, model,
+        timeout=config.agent_call_timeout,
+        hedge=config.hedge_enabled,
+        hedge_quantile=config.hedge_quantile,
+        hedge_min_samples=config.hedge_min_samples,
+    )
+    client = LimitedChatCompletionClient(client, model)
+    if config.model_affinity:
+        client = AffinityChatCompletionClient(client, model)
+    client = CachedChatCompletionClient(SingleFlightChatCompletionClient(client, model), model)
+    if config.replay_mode == "record":
+        client = RecordingChatCompletionClient(client, get_replay_log(), model)
+    return client
+
+
+# Clients are balanced over config.ollama_hosts and shared per model;
+# the registry is created on first use
+_client_registry = None
+
+
+def get_client_registry():
+    global _client_registry
+    if _client_registry is None:
+        from model_clients import ClientRegistry
+        _client_registry = ClientRegistry(wrap=wrap_model_client)
+    return _client_registry
 
 
 # -------------------------------
 # Helper to create agents
 # -------------------------------
-def create_agent_ollama(name: str, system_message: str) -> AssistantAgent:
+def create_agent_ollama(name: str, system_message: str) -> "AssistantAgent":
+    from autogen_agentchat.agents import AssistantAgent
     return AssistantAgent(
         name=name,
-        model_client=model_client_ollama,
+        model_client=get_client_registry().client_for_model(config.model2),
         system_message=system_message
     )
-def create_agent_deepseek(name: str, system_message: str) -> AssistantAgent:
+def create_agent_deepseek(name: str, system_message: str) -> "AssistantAgent":
+    from autogen_agentchat.agents import AssistantAgent
     return AssistantAgent(
         name=name,
-        model_client=model_client_deepseek,
+        model_client=get_client_registry().client_for_model(config.model1),
         system_message=system_message
     )
-def create_agent_strongollama(name: str, system_message: str) -> AssistantAgent:
+def create_agent_strongollama(name: str, system_message: str) -> "AssistantAgent":
+    return create_agent_ollama(name, system_message)
+
+# -------------------------------
+# AGENT SPECS (role -> agent name, system prompt, client role)
+# Roles use the labels the pipelines work with: NER types,
+# relation names, and the two summarizers.  The client role selects
+# the model client from client_registry (see config.role_models).
+# -------------------------------
+AGENT_SPECS = {
+    # NER type agents (extraction + debate participation)
+    "PER": ("PER_Agent", ner_prompts.PER_PROMPT, "ner"),
+    "LOC": ("LOC_Agent", ner_prompts.LOC_PROMPT, "ner"),
+    "ORG": ("ORG_Agent", ner_prompts.ORG_PROMPT, "ner"),
+
+    # Relation extraction agents
+    "Kill": ("Kill_Agent", re_prompts.KILL_RELATION_PROMPT, "re"),
+    "Live-in": ("LiveIn_Agent", re_prompts.LIVE_IN_RELATION_PROMPT, "re"),
+    "Work-for": ("WorkFor_Agent", re_prompts.WORK_FOR_RELATION_PROMPT, "re"),
+    "Located-in": ("LocatedIn_Agent", re_prompts.LOCATED_IN_RELATION_PROMPT, "re"),
+    "OrgBasedIn": ("OrgBased_Agent", re_prompts.ORG_BASED_IN_RELATION_PROMPT, "re"),
+    # All five relations in one call (config.re_joint_mode)
+    "Joint_RE": ("JointRE_Agent", re_prompts.JOINT_RELATION_PROMPT, "re"),
+
+    # Debate summarizers (meta agents)
+    "NER_Summarizer": ("Debate_Summarizer", debate_summarizer_prompt_ner.DEBATE_SUMMARIZER_PROMPT_NER, "summarizer"),
+    "RE_Summarizer": ("Debate_Summarizer_re", debate_summarizer_prompt_re.DEBATE_SUMMARIZER_PROMPT_RE, "summarizer"),
+}
+
+NER_ROLES = ("PER", "LOC", "ORG")
+RE_ROLES = ("Kill", "Live-in", "Work-for", "Located-in", "OrgBasedIn")
+
+
+def model_for(role: str, client_role: str = None) -> str:
+    """Model name behind new_agent(role, client_role=...), for metrics labels."""
+    return config.role_models[client_role or AGENT_SPECS[role][2]]
+
+
+def new_agent(role: str, model_client=None, client_role: str = None) -> "AssistantAgent":
+    """
+    Builds a fresh agent for `role` with an empty model context.
+
+    AssistantAgent keeps every message it has seen, so reusing one agent
+    across documents makes each prompt carry all earlier documents.  The
+    pipelines therefore take a new agent per document (and per debate);
+    construction is cheap because the model client is shared.
+
+    `client_role` overrides the spec's client role, e.g. "debate" for NER
+    or RE agents taking part in a debate.
+    """
+    from autogen_agentchat.agents import AssistantAgent
+
+    name, prompt, default_client_role = AGENT_SPECS[role]
     return AssistantAgent(
         name=name,
-        model_client=model_client_ollama,
-        system_message=system_message
+        model_client=model_client or get_client_registry().client_for_role(client_role or default_client_role),
+        system_message=prompt
     )
 
-# -------------------------------
-# NER TYPE AGENTS (PER / LOC / ORG)
-# These agents do BOTH:
-#   - NER extraction (JSON output)
-#   - Debate participation (natural arguments + final JSON line)
-# controlled by the task prompt.
-# -------------------------------
-per_agent = create_agent_deepseek("PER_Agent", ner_prompts.PER_PROMPT)
-loc_agent = create_agent_deepseek("LOC_Agent", ner_prompts.LOC_PROMPT)
-org_agent = create_agent_deepseek("ORG_Agent", ner_prompts.ORG_PROMPT)
 
+def new_debate_team(participants, parse_verdict, label_key: str):
+    """
+    RoundRobinGroupChat over `participants`, bounded by config.debate_max_turns
+    and stopped early once they agree on a verdict (debate_termination.py).
+    """
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    from debate_termination import VerdictTermination
 
-# -------------------------------
-# RELATION EXTRACTION AGENTS (Stage 2)
-# -------------------------------
-live_in_agent = create_agent_deepseek("LiveIn_Agent", re_prompts.LIVE_IN_RELATION_PROMPT)
-kill_agent = create_agent_deepseek("Kill_Agent", re_prompts.KILL_RELATION_PROMPT)
-work_for_agent = create_agent_deepseek("WorkFor_Agent", re_prompts.WORK_FOR_RELATION_PROMPT)
-located_in_agent = create_agent_deepseek("LocatedIn_Agent", re_prompts.LOCATED_IN_RELATION_PROMPT)
-org_based_agent = create_agent_deepseek("OrgBased_Agent", re_prompts.ORG_BASED_IN_RELATION_PROMPT)
+    return RoundRobinGroupChat(
+        participants=participants,
+        max_turns=config.debate_max_turns,
+        termination_condition=VerdictTermination(parse_verdict, label_key),
+    )
 
 
 # -------------------------------
-# DEBATE SUMMARIZER (Meta Agent)
+# Module-level agents
+# Kept for interactive use and existing imports (create_agents.per_agent,
+# client_registry, model_client_ollama, ...).  Each is built the first
+# time it is accessed.  Shared agents retain their context between runs;
+# the pipelines use new_agent() instead.
 # -------------------------------
-debate_summarizer = create_agent_deepseek(
-    "Debate_Summarizer",
-    debate_summarizer_prompt_ner.DEBATE_SUMMARIZER_PROMPT_NER
-)
-
-debate_summarizer_re=create_agent_deepseek(
-    "Debate_Summarizer_re",
-    debate_summarizer_prompt_re.DEBATE_SUMMARIZER_PROMPT_RE
-)
\ No newline at end of file
+MODULE_AGENTS = {
+    "per_agent": "PER",
+    "loc_agent": "LOC",
+    "org_agent": "ORG",
+    "live_in_agent": "Live-in",
+    "kill_agent": "Kill",
+    "work_for_agent": "Work-for",
+    "located_in_agent": "Located-in",
+    "org_based_agent": "OrgBasedIn",
+    "debate_summarizer": "NER_Summarizer",
+    "debate_summarizer_re": "RE_Summarizer",
+}
+
+_shared_agents = {}
+
+
+def shared_agent(role: str) -> "AssistantAgent":
+    """One long-lived agent per role, built on first use."""
+    if role not in _shared_agents:
+        _shared_agents[role] = new_agent(role)
+    return _shared_agents[role]
+
+
+def __getattr__(name: str):
+    if name in MODULE_AGENTS:
+        return shared_agent(MODULE_AGENTS[name])
+    if name == "replay_log":
+        return get_replay_log()
+    if name == "client_registry":
+        return get_client_registry()
+    if name == "model_client_ollama":
+        return get_client_registry().client_for_model(config.model2)
+    if name == "model_client_deepseek":
+        return get_client_registry().client_for_model(config.model1)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,44 @@
+# ==========================================
+# DEADLINES & HEDGING HELPERS
+# Per-call deadlines and hedged duplicates live in
+# model_clients.DeadlineChatCompletionClient; debates and summarizer
+# runs get a whole-run deadline through run_with_deadline().
+# ==========================================
+
+import asyncio
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        if len(self.samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+async def run_with_deadline(runner, task: str, timeout: Optional[float]):
+    """
+    `runner.run(task=...)` for an agent or team, cancelled once `timeout`
+    seconds pass (None = no deadline).  On timeout the cancellation token is
+    fired, which cancels the in-flight model call and its HTTP request, and
+    asyncio.TimeoutError is raised for the caller to degrade gracefully.
+    """
+    from autogen_core import CancellationToken
+
+    token = CancellationToken()
+    try:
+        return await asyncio.wait_for(runner.run(task=task, cancellation_token=token), timeout)
+    except asyncio.TimeoutError:
+        token.cancel()
+        raise
@@ -0,0 +1,84 @@
+# ==========================================
+# ADAPTIVE DEBATE TERMINATION
+# Debates used to run all max_turns turns and only parse the last message.
+# VerdictTermination parses every debater message as it arrives and stops
+# the RoundRobinGroupChat once the last `agree_turns` debater messages all
+# carry a valid verdict with the same label (e.g. the second speaker
+# repeats the first speaker's verdict).  max_turns stays the upper bound.
+# ==========================================
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, StopMessage
+
+import config
+
+
+class DebateTurnStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.debates = 0
+        self.agreed = 0
+        self.turns = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+debate_turn_stats = DebateTurnStats()
+
+
+class VerdictTermination(TerminationCondition):
+    """
+    - parse:        the pipeline's verdict parser (text → dict or None)
+    - label_key:    verdict field that has to agree ("type" / "relation")
+    - agree_turns:  consecutive agreeing verdicts needed to stop
+                    (default config.debate_agree_turns; 1 = first verdict)
+
+    The task message (source "user") is ignored.  `verdict` holds the
+    agreed verdict once the condition has fired.
+    """
+
+    def __init__(self, parse: Callable[[str], Any], label_key: str, agree_turns: Optional[int] = None):
+        self.parse = parse
+        self.label_key = label_key
+        self.agree_turns = max(1, agree_turns if agree_turns is not None else config.debate_agree_turns)
+        self.verdict: Optional[Dict[str, Any]] = None
+        self._labels: List[Optional[str]] = []
+        self._terminated = False
+        debate_turn_stats.debates += 1
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Debate already reached a verdict")
+
+        for message in messages:
+            if not isinstance(message, BaseChatMessage) or message.source == "user":
+                continue
+            debate_turn_stats.turns += 1
+            verdict = self.parse(message.to_text())
+            label = verdict.get(self.label_key) if isinstance(verdict, dict) else None
+            self._labels.append(label or None)
+
+            recent = self._labels[-self.agree_turns:]
+            if len(recent) == self.agree_turns and recent[0] and len(set(recent)) == 1:
+                self.verdict = verdict
+                self._terminated = True
+                debate_turn_stats.agreed += 1
+                return StopMessage(
+                    content=f"Verdict {label!r} agreed over {self.agree_turns} turn(s)",
+                    source="VerdictTermination",
+                )
+        return None
+
+    async def reset(self) -> None:
+        self.verdict = None
+        self._labels = []
+        self._terminated = False
@@ -0,0 +1,277 @@
+# ==========================================
+# GAZETTEER FAST PATH (NER pre-pass)
+# Resolves high-certainty spans without any LLM call:
+#   - known entities from a compiled gazetteer (Aho–Corasick automaton)
+#   - unambiguous title patterns such as "Officer Arjun" → PER
+# Only sentences that still contain unexplained capitalized tokens are
+# sent to the NER agents, and resolved spans never go to debate.
+# ==========================================
+
+import re
+import json
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from intra_group_debate_ner import extract_span_claims, resolve_span_conflicts
+from segmentation import split_sentences
+from span_clustering import cluster_span_map, attach_aliases
+
+log = logging.getLogger(__name__)
+
+NER_CALLS_PER_REGION = 3   # PER + LOC + ORG agents
+_capitalized_re = re.compile(r"\b[A-Z][\w'’-]*")
+# Capitalized words that follow a name without being part of it
+NON_NAME_WORDS = {
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+    "January", "February", "March", "April", "May", "June", "July", "August",
+    "September", "October", "November", "December",
+}
+
+
+# ---------------------
+# Aho–Corasick automaton
+# ---------------------
+class Gazetteer:
+    """
+    Multi-pattern matcher over known entity surfaces.
+
+    Matching is case-sensitive and limited to whole words.  Overlapping
+    hits are reduced to leftmost-longest.  A surface listed under more than
+    one type is ambiguous and is never resolved.
+    """
+
+    def __init__(self, entries: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self.types: Dict[str, set] = {}
+
+        for ent_type, surfaces in entries.items():
+            for surface in surfaces:
+                surface = surface.strip()
+                if surface:
+                    self.types.setdefault(surface, set()).add(ent_type)
+                    self._add(surface)
+        self._build()
+
+    def __len__(self):
+        return len(self.types)
+
+    def _add(self, surface: str) -> None:
+        node = 0
+        for ch in surface:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if surface not in self._out[node]:
+            self._out[node].append(surface)
+
+    def _build(self) -> None:
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = self._fail[node]
+                    while f and ch not in self._goto[f]:
+                        f = self._fail[f]
+                    self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Leftmost-longest whole-word matches as (start, end, surface)."""
+        hits = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for surface in self._out[node]:
+                start = i - len(surface) + 1
+                if _is_word_boundary(text, start, i + 1):
+                    hits.append((start, i + 1, surface))
+        return _leftmost_longest(hits)
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+def _leftmost_longest(hits: List[Tuple[int, int, Any]]) -> List[Tuple[int, int, Any]]:
+    chosen = []
+    last_end = -1
+    for start, end, value in sorted(hits, key=lambda h: (h[0], -(h[1] - h[0]))):
+        if start >= last_end:
+            chosen.append((start, end, value))
+            last_end = end
+    return chosen
+
+
+# ---------------------
+# Title / honorific patterns
+# ---------------------
+def compile_title_pattern(titles: List[str]):
+    """"<Title> Name" with an optional second name token in group 2."""
+    alternatives = "|".join(re.escape(t) for t in sorted(titles, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})\s+([A-Z][a-z]+)(?:\s+([A-Z][a-z]+))?\b")
+
+
+def match_titles(text: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) of each "<Title> Name" match; a second capitalized token
+    is kept only when it can be a surname (not a weekday, month or common
+    sentence word such as "Officer Arjun Monday").
+    """
+    found = []
+    for m in get_title_pattern().finditer(text):
+        second = m.group(2)
+        if second and (second in NON_NAME_WORDS or second in config.common_capitalized):
+            found.append((m.start(), m.end(1)))
+        else:
+            found.append((m.start(), m.end()))
+    return found
+
+
+def load_gazetteer_entries() -> Dict[str, List[str]]:
+    """config.gazetteer_entries merged with the JSON file at config.gazetteer_path."""
+    entries = {t: list(v) for t, v in config.gazetteer_entries.items()}
+    if config.gazetteer_path:
+        with open(config.gazetteer_path, encoding="utf-8") as f:
+            for ent_type, surfaces in json.load(f).items():
+                entries.setdefault(ent_type, []).extend(surfaces)
+    return entries
+
+
+# ---------------------
+# Savings counters
+# ---------------------
+class FastPathStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.documents = 0
+        self.sentences = 0
+        self.sentences_skipped = 0
+        self.chars_skipped = 0
+        self.spans_resolved = 0
+        self.ner_calls_saved = 0
+        self.debates_saved = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+fast_path_stats = FastPathStats()
+
+_gazetteer: Optional[Gazetteer] = None
+_title_re = None
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(load_gazetteer_entries())
+    return _gazetteer
+
+
+def get_title_pattern():
+    global _title_re
+    if _title_re is None:
+        _title_re = compile_title_pattern(config.direct_resolve_titles)
+    return _title_re
+
+
+# ---------------------
+# Pre-pass
+# ---------------------
+def match_known_entities(text: str) -> List[Dict[str, Any]]:
+    """High-certainty entities with document offsets, leftmost-longest."""
+    hits = []
+    for start, end, surface in get_gazetteer().find(text):
+        types = get_gazetteer().types[surface]
+        if len(types) == 1:
+            hits.append((start, end, next(iter(types))))
+    for start, end in match_titles(text):
+        hits.append((start, end, "PER"))
+
+    return [
+        {"span": text[start:end], "type": ent_type, "confidence": 1.0,
+         "start": start, "end": end, "source": "gazetteer"}
+        for start, end, ent_type in _leftmost_longest(hits)
+    ]
+
+
+def sentence_is_resolved(text: str, start: int, end: int, matches: List[Dict[str, Any]]) -> bool:
+    """
+    True when every capitalized token in the sentence lies inside a known
+    match, apart from a sentence-initial word from config.common_capitalized.
+    """
+    for m in _capitalized_re.finditer(text, start, end):
+        if m.start() == start and m.group(0) in config.common_capitalized:
+            continue
+        if not any(k["start"] <= m.start() and m.end() <= k["end"] for k in matches):
+            return False
+    return True
+
+
+async def run_ner_with_fast_path(text_input: str):
+    """
+    Drop-in replacement for run_intra_group_ner_pipeline with the
+    gazetteer/title pre-pass in front of it.
+
+    - Fully explained sentences are not sent to the agents.
+    - The remaining sentences are joined into one region for the agents.
+    - Agent claims on a span that the pre-pass already resolved are
+      replaced by the known entity, so no debate runs for it.
+    """
+    stats = fast_path_stats
+    stats.documents += 1
+
+    known = match_known_entities(text_input)
+    known_by_span = {}
+    for ent in known:
+        known_by_span.setdefault(ent["span"], ent)
+
+    sentences = split_sentences(text_input)
+    pending = [
+        (s, e) for s, e in sentences
+        if not sentence_is_resolved(text_input, s, e, known)
+    ]
+    stats.sentences += len(sentences)
+    stats.sentences_skipped += len(sentences) - len(pending)
+    stats.chars_skipped += sum(e - s for s, e in sentences) - sum(e - s for s, e in pending)
+
+    entities = list(known_by_span.values())
+    stats.spans_resolved += len(entities)
+
+    if not pending:
+        stats.ner_calls_saved += NER_CALLS_PER_REGION
+        log.info("⚡ Gazetteer resolved all %d sentences → no NER calls", len(sentences))
+        return entities
+
+    region = " ".join(text_input[s:e] for s, e in pending)
+    span_map = await extract_span_claims(region)
+
+    for span in list(span_map):
+        if span in known_by_span:
+            if len({c["type"] for c in span_map[span]}) > 1:
+                stats.debates_saved += 1
+            del span_map[span]
+
+    aliases = {}
+    if config.span_clustering_enabled:
+        span_map, aliases = cluster_span_map(span_map)
+
+    entities.extend(attach_aliases(await resolve_span_conflicts(span_map, region), aliases))
+    return entities
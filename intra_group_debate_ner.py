@@ -1,246 +1,297 @@
-import re
-import json
 import asyncio
-
-from autogen_agentchat.teams import RoundRobinGroupChat
-from create_agents import per_agent, loc_agent, org_agent, debate_summarizer
+import logging
+
+import config
+from create_agents import model_for, new_agent, new_debate_team
+from deadlines import run_with_deadline
+from json_extract import first_json_array, last_json_object
+from resolution_store import resolution_memo, normalize_span, context_signature
+from resolution_policy import ner_policy
+from cascade import run_cascaded
+from span_clustering import cluster_span_map, attach_aliases
+from structured_log import LazyJson, traced, trace_verdict
+from metrics import count_debate_outcome, measured, stage_timer
 from prompt_templates.ner.debate_prompt_ner import DEBATE_PROMPT_TEMPLATE
 
+log = logging.getLogger(__name__)
+
 
 # -----------------------------------------------------
-# Debug printer
+# JSON parsing of agent output (json_extract.py)
 # -----------------------------------------------------
-def debug_print(tag, data):
-    print(f"\n==================== {tag} ====================")
-    print(data)
-    print("===============================================\n")
+def parse_json_block(content: str):
+    """Extraction list from an NER agent's output ([] if there is none)."""
+    data = first_json_array(content)
+    if data is None:
+        log.debug("parse_json_block: no JSON array in %r", content)
+        return []
+    return data
+
 
+def parse_final_json(text: str):
+    """Last JSON object in a debate/summarizer output (the verdict), or None."""
+    data = last_json_object(text)
+    if data is None:
+        log.debug("parse_final_json: no JSON object in %r", text)
+    return data
 
 # -----------------------------------------------------
-# Robust JSON parser for NER agent output
-# (No more ### wrappers; tries to find a JSON array)
+# Span conflict resolution (bounded concurrency)
 # -----------------------------------------------------
-def parse_json_block(content: str):
+async def resolve_span(span: str, claims: list, text_input: str):
     """
-    Extracts a JSON list from the model output.
+    Resolves a single span: agreeing claims are accepted directly, a clear
+    winner (resolution_policy.ner_policy) or an earlier verdict is taken
+    without debate, otherwise debate → summarizer → highest-confidence
+    fallback.
 
-    Strategy:
-    1. Try to parse the entire content as JSON.
-    2. If that fails, search for the first JSON array substring `[ ... ]`
-       and try to parse that.
-    3. On failure, log and return [].
+    Debaters and the summarizer are created for this span only, so several
+    spans can be debated at once without sharing an agent's chat history.
     """
-    if not content:
-        debug_print("PARSE JSON BLOCK FAILED (EMPTY CONTENT)", content)
-        return []
+    entity, outcome = await _resolve_span(span, claims, text_input)
+    trace_verdict("ner", span, outcome, entity)
+    count_debate_outcome("ner", outcome)
+    return entity
+
+
+async def _resolve_span(span: str, claims: list, text_input: str):
+    """(entity, outcome) for resolve_span."""
+    log.debug("Processing span %r: %s", span, LazyJson(claims))
+
+    types = {c["type"] for c in claims}
+
+    # No conflict → choose first (they all agree)
+    if len(types) == 1:
+        chosen = claims[0]
+        log.info("✓ No conflict for '%s' → Auto-selected type %s", span, chosen["type"])
+        return chosen, "agree"
+
+    log.info("⚠️ Conflict Detected for '%s' → %s", span, types)
+
+    # ---- Clear winner by confidence margin or votes? ----
+    winner, outcome = ner_policy.decide(claims)
+    if winner:
+        ner_policy.stats.record(outcome)
+        log.info("   ⚖️ Clear %s → %s (no debate)", outcome, winner["type"])
+        return winner, outcome
+
+    # ---- Prior verdict for this span in a similar context? ----
+    memo_subject = normalize_span(span)
+    memo_context = context_signature(text_input, [span])
+    memo = resolution_memo.lookup("ner", memo_subject, memo_context)
+    if memo and memo.get("type") in types:
+        memo["span"] = span
+        ner_policy.stats.record("memo")
+        log.info("   ♻️ Reusing earlier verdict → %s", memo)
+        return memo, "memo"
+
+    ner_policy.stats.record("debate")
+
+    # ---- Build debate prompt ----
+    prompt = DEBATE_PROMPT_TEMPLATE.format(span=span, text=text_input)
+
+    # ---- Determine participants based on who claimed the span ----
+    participants = [
+        new_agent(label, client_role="debate")
+        for label in ("PER", "LOC", "ORG")
+        if label in types
+    ]
 
-    text = content.strip()
+    log.info("🗣 Starting Debate with: %s", [p.name for p in participants])
 
-    # First attempt: entire string is JSON
+    debate_team = new_debate_team(participants, parse_final_json, "type")
     try:
-        data = json.loads(text)
-        if isinstance(data, list):
-            return data
-    except Exception:
-        pass
-
-    # Second attempt: find a JSON array substring
-    match = re.search(r"\[.*\]", text, re.S)
-    if not match:
-        debug_print("PARSE JSON BLOCK FAILED (NO JSON ARRAY FOUND)", text)
-        return []
+        with stage_timer("ner_debate"):
+            debate_result = await traced(
+                measured(run_with_deadline(debate_team, prompt, config.debate_timeout),
+                         "ner_debate", "+".join(p.name for p in participants), config.role_models["debate"]),
+                "debate", kind="ner", subject=span, participants=[p.name for p in participants],
+            )
+    except Exception as e:
+        log.warning("   ⏱ Debate failed (%s) → Falling back to highest confidence", type(e).__name__)
+        return highest_confidence_claim(claims), "fallback"
+
+    # ---- Log debate transcript ----
+    debate_text = "\n".join(
+        f"[{getattr(m, 'source', getattr(m, 'sender', 'Agent'))}] {m.content}"
+        for m in debate_result.messages
+    )
+
+    # ---- Try to parse final JSON from last debate message ----
+    last_msg = debate_result.messages[-1].content
+    log.debug("Debate final message: %s", last_msg)
+
+    decision = parse_final_json(last_msg)
+
+    if decision:
+        log.info("   ✅ Debate resolved → %s", decision)
+        resolution_memo.record("ner", memo_subject, memo_context, decision, config.memo_debate_confidence)
+        return decision, "debate"
+
+    log.info("   ❌ Debate JSON invalid → invoking summarizer")
+
+    # ---- Summarizer fallback ----
+    summary_prompt = (
+        f"Span: {span}\n"
+        f"Sentence: {text_input}\n\n"
+        f"Full Debate Transcript:\n{debate_text}\n"
+    )
 
-    array_str = match.group(0).strip()
     try:
-        data = json.loads(array_str)
-        if isinstance(data, list):
-            return data
-        else:
-            debug_print("PARSE JSON BLOCK NOT A LIST", data)
-            return []
+        with stage_timer("ner_summarizer"):
+            summarizer = new_agent("NER_Summarizer")
+            summary_res = await traced(
+                measured(run_with_deadline(summarizer, summary_prompt, config.summarizer_timeout),
+                         "ner_summarizer", summarizer.name, model_for("NER_Summarizer")),
+                "agent_call", role="NER_Summarizer", subject=span,
+            )
+        summary_raw = summary_res.messages[-1].content
     except Exception as e:
-        debug_print("PARSE JSON BLOCK JSON ERROR", f"{array_str}\nERROR: {e}")
-        return []
+        log.warning("   ⏱ Summarizer failed (%s)", type(e).__name__)
+        summary_raw = ""
+
+    log.debug("Summarizer raw output: %s", summary_raw)
+
+    summary_json = parse_final_json(summary_raw)
+
+    if summary_json:
+        log.info("   🟢 Summarizer resolved → %s", summary_json)
+        resolution_memo.record("ner", memo_subject, memo_context, summary_json, config.memo_summarizer_confidence)
+        return summary_json, "summarizer"
+
+    log.warning("   ⚠️ Summarizer also failed → Falling back to highest confidence")
+
+    return highest_confidence_claim(claims), "fallback"
+
+
+def highest_confidence_claim(claims: list):
+    """Final fallback: highest-confidence claimant."""
+    fallback = max(
+        claims,
+        key=lambda x: float(x.get("confidence", 0.0))
+    )
+    log.debug("Fallback entity: %s", fallback)
+    return fallback
+
+
+async def resolve_span_conflicts(span_map: dict, text_input: str, max_concurrency: int = None):
+    """
+    Resolves every span in `span_map`, running at most `max_concurrency`
+    debates at once (default: `config.max_concurrent_debates`).
+
+    Results come back in `span_map` order, whichever debate finishes first.
+    """
+    if max_concurrency is None:
+        max_concurrency = config.max_concurrent_debates
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def bounded(span, claims):
+        async with semaphore:
+            return await resolve_span(span, claims, text_input)
+
+    return list(await asyncio.gather(
+        *(bounded(span, claims) for span, claims in span_map.items())
+    ))
+
+def last_content(result) -> str:
+    """Last message of an agent run; "" for a failed run (exception)."""
+    if isinstance(result, BaseException):
+        log.warning("Agent call failed: %s: %s", type(result).__name__, result)
+        return ""
+    return result.messages[-1].content if result.messages else ""
 
 
 # -----------------------------------------------------
-# Parser for debate / summarizer JSON (last-line strict)
+# NER extraction → span-grouped claims
 # -----------------------------------------------------
-def parse_final_json(text: str):
+async def extract_span_claims(text_input: str) -> dict:
     """
-    Robust JSON parser for debate/summarizer final output.
-    Accepts:
-    - single-line JSON
-    - multi-line pretty JSON
-    - JSON object anywhere in the string
+    Runs the PER / LOC / ORG agents on `text_input` and groups their typed
+    claims by span: {span: [claim, ...]}.
     """
-    if not text:
-        debug_print("FINAL JSON PARSE ERROR", "EMPTY TEXT")
-        return None
+    # ---- Run Per/Loc/Org in parallel (NER extraction) ----
+    # Fresh agents per document: no context carried over from earlier texts.
+    log.info("⚙️ Launching PER / LOC / ORG NER Agents ...")
+    # A failed or timed-out agent contributes no claims; the others still count.
+    if config.cascade_enabled:
+        # Fast model first; low-confidence / unparsable answers re-asked of the large one
+        tasks = [run_cascaded("ner", role, text_input) for role in ("PER", "LOC", "ORG")]
+    else:
+        agents = {role: new_agent(role) for role in ("PER", "LOC", "ORG")}
+        tasks = [
+            traced(measured(agent.run(task=text_input), "ner_fanout", agent.name, model_for(role)),
+                   "agent_call", role=role)
+            for role, agent in agents.items()
+        ]
+    with stage_timer("ner_fanout"):
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    with stage_timer("span_grouping"):
+        # ---- Raw debug logs ----
+        per_raw, loc_raw, org_raw = (last_content(r) for r in results)
+
+        log.debug("PER raw output: %s", per_raw)
+        log.debug("LOC raw output: %s", loc_raw)
+        log.debug("ORG raw output: %s", org_raw)
+
+        # ---- Parse JSON blocks (NER outputs) ----
+        per_output = parse_json_block(per_raw)
+        loc_output = parse_json_block(loc_raw)
+        org_output = parse_json_block(org_raw)
+
+        # ---- Attach type tags ----
+        all_entities = []
+        for ent in per_output:
+            if not isinstance(ent, dict):
+                continue
+            ent = dict(ent)
+            ent["type"] = "PER"
+            all_entities.append(ent)
+
+        for ent in loc_output:
+            if not isinstance(ent, dict):
+                continue
+            ent = dict(ent)
+            ent["type"] = "LOC"
+            all_entities.append(ent)
+
+        for ent in org_output:
+            if not isinstance(ent, dict):
+                continue
+            ent = dict(ent)
+            ent["type"] = "ORG"
+            all_entities.append(ent)
+
+        log.debug("All entities: %s", LazyJson(all_entities))
+
+        # ---- Group by span ----
+        span_map = {}
+        for ent in all_entities:
+            span = ent.get("span")
+            # Models occasionally answer a bare number ({"span": 2024})
+            if isinstance(span, (int, float)) and not isinstance(span, bool):
+                span = ent["span"] = str(span)
+            if not isinstance(span, str) or not span.strip():
+                continue
+            span_map.setdefault(span, []).append(ent)
+
+        log.debug("Span grouped entities: %s", LazyJson(span_map))
+
+    return span_map
 
-    # ---------- 1) Try last line (original logic) ----------
-    last = text.strip().split("\n")[-1].strip()
-    try:
-        return json.loads(last)
-    except:
-        pass
-
-    # ---------- 2) Try to find ANY JSON object in output ----------
-    m = re.search(r"\{[\s\S]*?\}", text)
-    if m:
-        candidate = m.group(0)
-        try:
-            return json.loads(candidate)
-        except Exception as e:
-            debug_print("FINAL JSON FOUND BUT INVALID", f"{candidate}\nERROR: {e}")
-
-    # ---------- 3) Failure ----------
-    debug_print("FINAL JSON PARSE ERROR", text)
-    return None
 
 # -----------------------------------------------------
 # Intra-Group Debate Pipeline (full version)
 # -----------------------------------------------------
 async def run_intra_group_ner_pipeline(text_input: str):
-    print(f"\n📄 Processing: \"{text_input}\"")
-
-    # ---- Run Per/Loc/Org in parallel (NER extraction) ----
-    print("\n⚙️ Launching PER / LOC / ORG NER Agents ...")
-    tasks = [
-        per_agent.run(task=text_input),
-        loc_agent.run(task=text_input),
-        org_agent.run(task=text_input),
-    ]
-    results = await asyncio.gather(*tasks)
-
-    # ---- Raw debug logs ----
-    per_raw = results[0].messages[-1].content
-    loc_raw = results[1].messages[-1].content
-    org_raw = results[2].messages[-1].content
-
-    debug_print("PER RAW OUTPUT", per_raw)
-    debug_print("LOC RAW OUTPUT", loc_raw)
-    debug_print("ORG RAW OUTPUT", org_raw)
-
-    # ---- Parse JSON blocks (NER outputs) ----
-    per_output = parse_json_block(per_raw)
-    loc_output = parse_json_block(loc_raw)
-    org_output = parse_json_block(org_raw)
-
-    # ---- Attach type tags ----
-    all_entities = []
-    for ent in per_output:
-        ent = dict(ent)
-        ent["type"] = "PER"
-        all_entities.append(ent)
-
-    for ent in loc_output:
-        ent = dict(ent)
-        ent["type"] = "LOC"
-        all_entities.append(ent)
-
-    for ent in org_output:
-        ent = dict(ent)
-        ent["type"] = "ORG"
-        all_entities.append(ent)
-
-    debug_print("ALL ENTITIES", all_entities)
-
-    # ---- Group by span ----
-    span_map = {}
-    for ent in all_entities:
-        span = ent.get("span")
-        if not span:
-            continue
-        span_map.setdefault(span, []).append(ent)
-
-    debug_print("SPAN GROUPED ENTITIES", span_map)
-
-    final_entities = []
-
-    # ---- Resolve conflicts span-wise ----
-    for span, claims in span_map.items():
-        debug_print(f"PROCESSING SPAN '{span}'", claims)
-
-        types = {c["type"] for c in claims}
-
-        # No conflict → choose first (they all agree)
-        if len(types) == 1:
-            chosen = claims[0]
-            print(f"✓ No conflict for '{span}' → Auto-selected type {chosen['type']}")
-            final_entities.append(chosen)
-            continue
-
-        print(f"\n⚠️ Conflict Detected for '{span}' → {types}")
-
-        # ---- Build debate prompt ----
-        prompt = DEBATE_PROMPT_TEMPLATE.format(span=span, text=text_input)
-        #debug_print("DEBATE PROMPT", prompt)
-
-        # ---- Determine participants based on who claimed the span ----
-        participants = []
-        if "PER" in types:
-            participants.append(per_agent)
-        if "LOC" in types:
-            participants.append(loc_agent)
-        if "ORG" in types:
-            participants.append(org_agent)
-
-        print(f"🗣 Starting Debate with: {[p.name for p in participants]}")
-
-        debate_team = RoundRobinGroupChat(participants=participants, max_turns=3)
-        debate_result = await debate_team.run(task=prompt)
-
-        # ---- Log debate transcript ----
-        debate_text = "\n".join(
-            f"[{getattr(m, 'source', getattr(m, 'sender', 'Agent'))}] {m.content}"
-            for m in debate_result.messages
-        )
-        #debug_print("FULL DEBATE TRANSCRIPT", debate_text)
-
-        # ---- Try to parse final JSON from last debate message ----
-        last_msg = debate_result.messages[-1].content
-        debug_print("DEBATE FINAL MESSAGE", last_msg)
-
-        decision = parse_final_json(last_msg)
-
-        if decision:
-            print(f"   ✅ Debate resolved → {decision}")
-            final_entities.append(decision)
-            continue
-
-        print("   ❌ Debate JSON invalid → invoking summarizer")
-
-        # ---- Summarizer fallback ----
-        summary_prompt = (
-            f"Span: {span}\n"
-            f"Sentence: {text_input}\n\n"
-            f"Full Debate Transcript:\n{debate_text}\n"
-        )
-        #debug_print("SUMMARIZER PROMPT", summary_prompt)
-
-        summary_res = await debate_summarizer.run(task=summary_prompt)
-        summary_raw = summary_res.messages[-1].content
-
-        debug_print("SUMMARIZER RAW OUTPUT", summary_raw)
-
-        summary_json = parse_final_json(summary_raw)
-
-        if summary_json:
-            print(f"   🟢 Summarizer resolved → {summary_json}")
-            final_entities.append(summary_json)
-            continue
-
-        print("   ⚠️ Summarizer also failed → Falling back to highest confidence")
-
-        # ---- Final fallback: highest-confidence claimant ----
-        fallback = max(
-            claims,
-            key=lambda x: float(x.get("confidence", 0.0))
-        )
-        debug_print("FALLBACK ENTITY", fallback)
-        final_entities.append(fallback)
+    log.info("📄 Processing: \"%s\"", text_input)
 
-    return final_entities
+    span_map = await extract_span_claims(text_input)
 
+    # Near-duplicate spans ("Officer Arjun" / "Arjun") are resolved once
+    aliases = {}
+    if config.span_clustering_enabled:
+        with stage_timer("span_clustering"):
+            span_map, aliases = cluster_span_map(span_map)
 
+    return attach_aliases(await resolve_span_conflicts(span_map, text_input), aliases)
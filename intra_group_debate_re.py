@@ -1,63 +1,30 @@
 # intra_group_debate_re.py
 import json
 import asyncio
-import re
-from typing import List, Dict, Any
-
-from autogen_agentchat.teams import RoundRobinGroupChat
+import logging
+from typing import List, Dict, Any, Tuple
 
 # your project imports
+import config
 import create_agents
 from prompt_templates.re.debate_prompt_re import RE_DEBATE_PROMPT_TEMPLATE
-from intra_group_debate_ner import run_intra_group_ner_pipeline
-
-DEBUG = False
-def dprint(tag, x):
-    if DEBUG:
-        print(f"\n===== {tag} =====\n{x}\n=======================\n")
+from deadlines import run_with_deadline
+from json_extract import first_json_array, last_json_object, loads as json_loads
+from intra_group_debate_ner import run_intra_group_ner_pipeline, last_content
+from resolution_store import resolution_memo, normalize_span, context_signature
+from resolution_policy import re_policy
+from cascade import run_cascaded
+from span_clustering import alias_map_from_entities
+from structured_log import LazyJson, traced, trace_verdict
+from metrics import count_debate_outcome, measured, stage_timer
+
+log = logging.getLogger(__name__)
 
 # ---------------------
-# Robust JSON extraction helpers
+# JSON extraction (json_extract.py)
 # ---------------------
-_codefence_re = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
-_json_array_re = re.compile(r"\[[\s\S]*?\]")
-_json_object_re = re.compile(r"\{[\s\S]*\}")
-
-def strip_wrappers(text: str) -> str:
-    if not text:
-        return ""
-    t = text.strip()
-    m = _codefence_re.search(t)
-    if m:
-        return m.group(1).strip()
-    return t.replace("`", "").strip()
-
-def find_first_json_array(text: str):
-    t = strip_wrappers(text)
-    m = _json_array_re.search(t)
-    if not m:
-        return None
-    try:
-        return json.loads(m.group(0))
-    except:
-        try:
-            return json.loads(m.group(0).replace("'", '"'))
-        except:
-            return None
-
-def find_last_json_object(text: str):
-    t = strip_wrappers(text)
-    matches = list(_json_object_re.finditer(t))
-    if not matches:
-        return None
-    last = matches[-1].group(0)
-    try:
-        return json.loads(last)
-    except:
-        try:
-            return json.loads(last.replace("'", '"'))
-        except:
-            return None
+find_first_json_array = first_json_array
+find_last_json_object = last_json_object
 
 def parse_json_list_from_agent(text: str) -> List[Dict[str, Any]]:
     if not text:
@@ -73,9 +40,9 @@ def parse_json_list_from_agent(text: str) -> List[Dict[str, Any]]:
                 s = el.strip()
                 if s.startswith("{") and s.endswith("}"):
                     try:
-                        out.append(json.loads(s))
+                        out.append(json_loads(s))
                         continue
-                    except:
+                    except ValueError:
                         pass
                 if "->" in s:
                     a, b = [p.strip() for p in s.split("->", 1)]
@@ -96,52 +63,153 @@ def build_candidate_pairs(entities: List[Dict[str, Any]]):
     spans = [e.get("span") for e in entities if e.get("span")]
     return [(h, t) for h in spans for t in spans if h != t]
 
-# ---------------------
-# Main RE pipeline — NO TIMEOUTS
-# ---------------------
-async def run_intra_group_debate_re(sentence: str, entities: List[Dict[str, Any]]):
-    print(f"\n🔗 Running RE pipeline on:\n\"{sentence}\"\n")
-    print(f"🧩 Entities:\n{json.dumps(entities, indent=2)}")
-
-    AGENTS = {
-        "Kill": create_agents.kill_agent,
-        "Live-in": create_agents.live_in_agent,
-        "Work-for": create_agents.work_for_agent,
-        "Located-in": create_agents.located_in_agent,
-        "OrgBasedIn": create_agents.org_based_agent,
-    }
-
-    print("\n🚀 Calling RE agents (5 calls total)...")
+# (head type, tail type) each relation can connect
+RELATION_SIGNATURES = {
+    "Kill": ("PER", "PER"),
+    "Live-in": ("PER", "LOC"),
+    "Work-for": ("PER", "ORG"),
+    "Located-in": ("LOC", "LOC"),
+    "OrgBasedIn": ("ORG", "LOC"),
+}
+
+def build_typed_candidate_pairs(entities: List[Dict[str, Any]]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Type-valid (head, tail) span pairs per relation, using the NER `type`.
+    Entities without a type are kept as possible heads/tails for every
+    relation.  Relations with no valid pair are left out.
+    """
+    by_type = {}
+    untyped = []
+    for e in entities:
+        span = e.get("span")
+        if not span:
+            continue
+        bucket = by_type.setdefault(e["type"], []) if e.get("type") else untyped
+        if span not in bucket:
+            bucket.append(span)
+
+    pairs_by_relation = {}
+    for rel_name, (head_type, tail_type) in RELATION_SIGNATURES.items():
+        heads = by_type.get(head_type, []) + untyped
+        tails = by_type.get(tail_type, []) + untyped
+        pairs = list(dict.fromkeys((h, t) for h in heads for t in tails if h != t))
+        if pairs:
+            pairs_by_relation[rel_name] = pairs
+    return pairs_by_relation
+
+def build_pair_payload(sentence: str, pairs: List[Tuple[str, str]]) -> str:
+    pair_lines = "\n".join(f"- {h} -> {t}" for h, t in pairs)
+    return (
+        f"Sentence: {sentence}\n"
+        f"Candidate pairs (head -> tail):\n{pair_lines}\n"
+        "Return: ONLY a JSON list of relation objects, using only these pairs."
+    )
 
-    payload_text = (
+def build_joint_pair_payload(sentence: str, pairs_by_relation: Dict[str, List[Tuple[str, str]]]) -> str:
+    sections = "\n".join(
+        f"{rel_name}:\n" + "\n".join(f"- {h} -> {t}" for h, t in pairs)
+        for rel_name, pairs in pairs_by_relation.items()
+    )
+    return (
         f"Sentence: {sentence}\n"
-        f"Entities: {json.dumps(entities)}\n"
-        "Return: ONLY a JSON list of relation objects."
+        f"Candidate pairs per relation (head -> tail):\n{sections}\n"
+        "Return: ONLY a JSON list of relation objects, using only these relations and pairs."
     )
 
-    tasks, names = [], []
-    for rel_name, agent in AGENTS.items():
-        tasks.append(agent.run(task=payload_text))
-        names.append(rel_name)
+# ---------------------
+# Main RE pipeline
+# Every model call has a deadline (config.agent_call_timeout); debates and
+# summarizer runs have their own (config.debate_timeout / summarizer_timeout)
+# and degrade to the highest-confidence claim when they miss it.
+# ---------------------
+async def run_intra_group_debate_re(sentence: str, entities: List[Dict[str, Any]], pair_mode: bool = None,
+                                    joint_mode: bool = None):
+    """
+    pair_mode (default: config.re_pair_mode) asks each relation agent only
+    about the type-valid pairs for its relation and skips agents that have
+    none; otherwise every agent gets the full entity list.
+
+    joint_mode (default: config.re_joint_mode) replaces the five relation
+    agents with one Joint_RE call; its triples are split by relation into
+    the same claims, so conflicting relations are still debated.
+    """
+    if pair_mode is None:
+        pair_mode = config.re_pair_mode
+    if joint_mode is None:
+        joint_mode = config.re_joint_mode
+
+    log.info("🔗 Running RE pipeline on: \"%s\"", sentence)
+    log.debug("🧩 Entities: %s", LazyJson(entities))
+
+    if pair_mode:
+        pairs_by_relation = build_typed_candidate_pairs(entities)
+        payloads = {
+            rel_name: build_pair_payload(sentence, pairs)
+            for rel_name, pairs in pairs_by_relation.items()
+        }
+        allowed_pairs = {rel_name: set(pairs) for rel_name, pairs in pairs_by_relation.items()}
+    else:
+        payload_text = (
+            f"Sentence: {sentence}\n"
+            f"Entities: {json.dumps(entities)}\n"
+            "Return: ONLY a JSON list of relation objects."
+        )
+        payloads = {rel_name: payload_text for rel_name in create_agents.RE_ROLES}
+        allowed_pairs = None
+
+    if joint_mode and payloads:
+        if pair_mode:
+            joint_payload = build_joint_pair_payload(sentence, pairs_by_relation)
+        else:
+            joint_payload = payload_text
+        payloads = {"Joint_RE": joint_payload}
 
-    # ❌ No timeout here
-    results = await asyncio.gather(*tasks)
+    log.info("🚀 Calling RE agents (%d calls total)...", len(payloads))
 
+    tasks, names = [], []
+    if config.cascade_enabled:
+        # Fast model first; low-confidence / unparsable answers re-asked of the large one
+        for rel_name, payload in payloads.items():
+            tasks.append(run_cascaded("re", rel_name, payload))
+            names.append(rel_name)
+    else:
+        # Fresh agents per call so no context is carried over from earlier sentences
+        AGENTS = {rel_name: create_agents.new_agent(rel_name) for rel_name in payloads}
+        for rel_name, agent in AGENTS.items():
+            tasks.append(traced(
+                measured(agent.run(task=payloads[rel_name]), "re_fanout", agent.name,
+                         create_agents.model_for(rel_name)),
+                "agent_call", role=rel_name,
+            ))
+            names.append(rel_name)
+
+    # A failed or timed-out agent contributes no claims; the others still count.
+    with stage_timer("re_fanout"):
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Agents may answer with an alias of a clustered entity
+    alias_map = alias_map_from_entities(entities)
     claims_map = {}
 
-    for rel_name, res in zip(names, results):
-        raw = res.messages[-1].content if res.messages else ""
-        dprint(f"RAW {rel_name}", raw)
+    for agent_name, res in zip(names, results):
+        raw = last_content(res)
+        log.debug("RAW %s: %s", agent_name, raw)
 
         parsed = parse_json_list_from_agent(raw)
 
         for item in parsed:
             if not isinstance(item, dict):
                 continue
-            head = item.get("head")
-            tail = item.get("tail")
+            head = alias_map.get(item.get("head"), item.get("head"))
+            tail = alias_map.get(item.get("tail"), item.get("tail"))
             if not head or not tail:
                 continue
+            # The joint agent names the relation of each triple itself
+            rel_name = item.get("relation") if agent_name == "Joint_RE" else agent_name
+            if rel_name not in create_agents.RE_ROLES:
+                continue
+            if allowed_pairs is not None and (head, tail) not in allowed_pairs.get(rel_name, ()):
+                continue
 
             claim = {
                 "head": head,
@@ -156,11 +224,12 @@ async def run_intra_group_debate_re(sentence: str, entities: List[Dict[str, Any]
 
             claims_map.setdefault((head, tail), []).append(claim)
 
-    json_safe = {f"{h} -> {t}": v for (h, t), v in claims_map.items()}
-    print(f"\n📌 Raw RE claims:\n{json.dumps(json_safe, indent=2)}")
+    if log.isEnabledFor(logging.DEBUG):
+        json_safe = {f"{h} -> {t}": v for (h, t), v in claims_map.items()}
+        log.debug("📌 Raw RE claims: %s", LazyJson(json_safe))
 
     if not claims_map:
-        print("\n=== No RE claims detected ===")
+        log.info("=== No RE claims detected ===")
         return []
 
     final = []
@@ -170,56 +239,112 @@ async def run_intra_group_debate_re(sentence: str, entities: List[Dict[str, Any]
 
         if len(rel_types) == 1:
             best = max(claims, key=lambda c: c.get("confidence", 1.0))
+            trace_verdict("re", f"{head} -> {tail}", "agree", best)
             final.append(best)
             continue
 
-        print(f"\n⚠️ Conflict for: {head} → {tail}")
-        print(f"   Claims: {rel_types}")
-
-        prompt = RE_DEBATE_PROMPT_TEMPLATE.format(
-            head=head, tail=tail, sentence=sentence
-        )
-
-        participants = [AGENTS[r] for r in rel_types]
-
-        # ❌ NO timeout
-        debate = RoundRobinGroupChat(participants=participants, max_turns=3)
-        debate_res = await debate.run(task=prompt)
-
-        debate_last = debate_res.messages[-1].content
-        decision = find_last_json_object(debate_last)
-
-        if isinstance(decision, dict) and decision.get("relation"):
-            print("   ✅ Debate chose:", decision)
-            final.append(decision)
-            continue
+        verdict, outcome = await resolve_pair_conflict(head, tail, claims, rel_types, sentence)
+        trace_verdict("re", f"{head} -> {tail}", outcome, verdict)
+        count_debate_outcome("re", outcome)
+        final.append(verdict)
 
-        print("   ❌ Debate JSON invalid → using summarizer")
+    return final
 
-        transcript = "\n".join(m.content for m in debate_res.messages)
-        summ_payload = (
-            f"Head: {head}\nTail: {tail}\nSentence: {sentence}\n\n"
-            f"Debate:\n{transcript}"
-        )
 
-        # ❌ NO timeout
-        sum_res = await create_agents.debate_summarizer_re.run(task=summ_payload)
-        sum_last = sum_res.messages[-1].content
-        sum_decision = find_last_json_object(sum_last)
+async def resolve_pair_conflict(head: str, tail: str, claims: List[Dict[str, Any]], rel_types: set,
+                                sentence: str):
+    """
+    (verdict, outcome) for a (head, tail) pair with conflicting relations:
+    clear winner → earlier verdict → debate → summarizer → highest confidence.
+    """
+    log.info("⚠️ Conflict for: %s → %s", head, tail)
+    log.info("   Claims: %s", rel_types)
+
+    winner, outcome = re_policy.decide(claims)
+    if winner:
+        re_policy.stats.record(outcome)
+        log.info("   ⚖️ Clear %s → %s (no debate)", outcome, winner["relation"])
+        return winner, outcome
+
+    memo_subject = f"{normalize_span(head)} -> {normalize_span(tail)}"
+    memo_context = context_signature(sentence, [head, tail])
+    memo = resolution_memo.lookup("re", memo_subject, memo_context)
+    if memo and memo.get("relation") in rel_types | {"no_relation"}:
+        memo.update(head=head, tail=tail)
+        re_policy.stats.record("memo")
+        log.info("   ♻️ Reusing earlier verdict: %s", memo)
+        return memo, "memo"
+
+    re_policy.stats.record("debate")
+
+    prompt = RE_DEBATE_PROMPT_TEMPLATE.format(
+        head=head, tail=tail, sentence=sentence
+    )
 
-        if isinstance(sum_decision, dict):
-            print("   🟢 Summarizer chose:", sum_decision)
-            final.append(sum_decision)
-            continue
+    # Debaters start clean rather than carrying the extraction transcript
+    participants = [
+        create_agents.new_agent(r, client_role="debate")
+        for r in create_agents.RE_ROLES if r in rel_types
+    ]
 
-        final.append(max(claims, key=lambda c: c.get("confidence", 0.0)))
+    debate = create_agents.new_debate_team(participants, find_last_json_object, "relation")
+    try:
+        with stage_timer("re_debate"):
+            debate_res = await traced(
+                measured(run_with_deadline(debate, prompt, config.debate_timeout),
+                         "re_debate", "+".join(p.name for p in participants),
+                         config.role_models["debate"]),
+                "debate", kind="re", subject=f"{head} -> {tail}", participants=[p.name for p in participants],
+            )
+    except Exception as e:
+        log.warning("   ⏱ Debate failed (%s) → using highest confidence", type(e).__name__)
+        return max(claims, key=lambda c: c.get("confidence", 0.0)), "fallback"
+
+    debate_last = debate_res.messages[-1].content
+    decision = find_last_json_object(debate_last)
+
+    if isinstance(decision, dict) and decision.get("relation"):
+        log.info("   ✅ Debate chose: %s", decision)
+        resolution_memo.record("re", memo_subject, memo_context, decision, config.memo_debate_confidence)
+        return decision, "debate"
+
+    log.info("   ❌ Debate JSON invalid → using summarizer")
+
+    transcript = "\n".join(m.content for m in debate_res.messages)
+    summ_payload = (
+        f"Head: {head}\nTail: {tail}\nSentence: {sentence}\n\n"
+        f"Debate:\n{transcript}"
+    )
 
-    return final
+    try:
+        with stage_timer("re_summarizer"):
+            summarizer = create_agents.new_agent("RE_Summarizer")
+            sum_res = await traced(
+                measured(run_with_deadline(summarizer, summ_payload, config.summarizer_timeout),
+                         "re_summarizer", summarizer.name, create_agents.model_for("RE_Summarizer")),
+                "agent_call", role="RE_Summarizer", subject=f"{head} -> {tail}",
+            )
+        sum_decision = find_last_json_object(sum_res.messages[-1].content)
+    except Exception as e:
+        log.warning("   ⏱ Summarizer failed (%s)", type(e).__name__)
+        sum_decision = None
+
+    if isinstance(sum_decision, dict):
+        log.info("   🟢 Summarizer chose: %s", sum_decision)
+        if sum_decision.get("relation"):
+            resolution_memo.record("re", memo_subject, memo_context, sum_decision,
+                                   config.memo_summarizer_confidence)
+        return sum_decision, "summarizer"
+
+    return max(claims, key=lambda c: c.get("confidence", 0.0)), "fallback"
 
 # ---------------------
 # TEST MAIN
 # ---------------------
 if __name__ == "__main__":
+    from structured_log import configure_logging
+    configure_logging()
+
     async def main():
         text = "During a routine week in the city of Greenhill, Arjun lived in Maple Town with his sister Rina. Every morning, Arjun worked in BrightTech, an organization based in Silver City, while Rina worked for the local news group Daily Echo. One afternoon, a report said that a criminal named Victor was killed by Officer Arjun near the Old Bridge inside North Valley. Daily Echo announced that their main office is located in Central Plaza, and BrightTech is headquartered inside Silver District. Rina later moved to Pine Town, which is inside North Valley, but still worked for Daily Echo. Arjun also visited Lakeview Park, which is located in Greenhill, after finishing his duty."
 
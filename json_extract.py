@@ -0,0 +1,248 @@
+# ==========================================
+# JSON EXTRACTION FROM MODEL OUTPUT
+# Shared by both pipelines:
+#   - iter_json / first_json_array / last_json_object: one pass over a
+#     finished response that skips <think> blocks, finds balanced [...] /
+#     {...} candidates (brackets inside strings do not count; code fences
+#     and prose around them are simply skipped) and decodes each once
+#   - JsonStreamScanner: the same idea incrementally, while a response is
+#     still streaming, so extraction calls can stop at the first list
+# Decoding uses orjson when it is installed, json otherwise.
+# ==========================================
+
+import re
+import json
+from typing import Any, Iterator, List, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+_CLOSERS = {"[": "]", "{": "}"}
+
+_INVALID = object()
+_top_re = re.compile(r"<think>|[\[{]")
+# Skips plain text and complete "..." strings (escapes included) in one
+# match and captures the next bracket; an unterminated string captures '"'
+_next_bracket_re = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*(.)', re.S)
+
+
+def is_extraction_list(value: Any) -> bool:
+    """A finished extraction answer: a list of objects (possibly empty)."""
+    return isinstance(value, list) and all(isinstance(v, dict) for v in value)
+
+
+def loads(candidate: str) -> Any:
+    """Decodes one JSON candidate; single-quoted pseudo-JSON is retried with double quotes."""
+    try:
+        return _loads(candidate)
+    except ValueError:
+        if "'" in candidate and '"' not in candidate:
+            return _loads(candidate.replace("'", '"'))
+        raise
+
+
+def _decode(candidate: str) -> Any:
+    try:
+        return loads(candidate)
+    except ValueError:
+        return _INVALID
+
+
+def _balanced_end(text: str, start: int) -> Optional[int]:
+    """End (exclusive) of the balanced candidate opening at `start`, or None."""
+    stack = [_CLOSERS[text[start]]]
+    i = start + 1
+    while True:
+        m = _next_bracket_re.match(text, i)
+        if m is None:
+            return None
+        c = m.group(1)
+        i = m.end()
+        if c not in "[]{}":
+            return None                     # unterminated string / end of text
+        if c in _CLOSERS:
+            stack.append(_CLOSERS[c])
+        elif c != stack.pop():
+            return None
+        elif not stack:
+            return i
+
+
+def iter_json(text: Optional[str]) -> Iterator[Any]:
+    """
+    Decoded top-level JSON values in `text`, in order, outside <think>
+    blocks (an unclosed <think> is treated as plain text).  A candidate
+    that does not decode (e.g. prose "[sic]") is skipped and the scan
+    resumes inside it, so a valid value nested in it is still found.
+    """
+    if not text:
+        return
+    pos = 0
+    while True:
+        m = _top_re.search(text, pos)
+        if m is None:
+            return
+        if m.group() == THINK_OPEN:
+            close = text.find(THINK_CLOSE, m.end())
+            pos = m.end() if close == -1 else close + len(THINK_CLOSE)
+            continue
+        start = m.start()
+        end = _balanced_end(text, start)
+        if end is not None:
+            value = _decode(text[start:end])
+            if value is not _INVALID:
+                yield value
+                pos = end
+                continue
+        pos = start + 1
+
+
+def _nested_list(obj: dict) -> Optional[List[Any]]:
+    """First list of objects (or empty list) among `obj`'s values, depth first."""
+    for value in obj.values():
+        if is_extraction_list(value):
+            return value
+        if isinstance(value, dict):
+            found = _nested_list(value)
+            if found is not None:
+                return found
+    return None
+
+
+def first_json_array(text: Optional[str]) -> Optional[List[Any]]:
+    """
+    First extraction list in `text`: the first array of objects (or empty
+    array), else the first array of any kind.  Without a
+    top-level array, the first list of objects wrapped in a top-level
+    object ({"entities": [...]}, {"relations": [...]}), else None.
+    """
+    fallback = nested = None
+    for value in iter_json(text):
+        if isinstance(value, list):
+            if is_extraction_list(value):
+                return value
+            if fallback is None:
+                fallback = value
+        elif nested is None and isinstance(value, dict):
+            nested = _nested_list(value)
+    return fallback if fallback is not None else nested
+
+
+def last_json_object(text: Optional[str]) -> Optional[dict]:
+    """Last top-level JSON object in `text` (the final debate/summarizer verdict), or None."""
+    last = None
+    for value in iter_json(text):
+        if isinstance(value, dict):
+            last = value
+    return last
+
+
+class JsonStreamScanner:
+    """
+    Feed streamed text with feed(); it returns True once a balanced
+    top-level `[...]` outside any <think> block has closed and decodes to
+    an extraction list (see is_extraction_list).  Objects never stop the
+    stream: a debate/summarizer decision is the last line of its answer,
+    and an object earlier in a turn may just quote a claim.
+
+    Strings are respected, so brackets inside quoted values do not count.
+    Prose brackets such as "[sic]" close without decoding and are skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.chunks = 0
+        self.value: Optional[Any] = None
+        self.end: Optional[int] = None
+
+        self._pos = 0
+        self._in_think = False
+        self._stack = []
+        self._start = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete:
+            return True
+        self.text += chunk
+        self.chunks += 1
+        return self._scan()
+
+    def _scan(self) -> bool:
+        text = self.text
+        n = len(text)
+        i = self._pos
+
+        while i < n:
+            # ---- inside <think> ... </think>: skip to the closing tag ----
+            if self._in_think:
+                close = text.find(THINK_CLOSE, i)
+                if close == -1:
+                    i = max(i, n - len(THINK_CLOSE))
+                    break
+                i = close + len(THINK_CLOSE)
+                self._in_think = False
+                continue
+
+            c = text[i]
+
+            # ---- inside a JSON candidate ----
+            if self._stack:
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif c == "\\":
+                        self._escape = True
+                    elif c == '"':
+                        self._in_string = False
+                elif c == '"':
+                    self._in_string = True
+                elif c in _CLOSERS:
+                    self._stack.append(_CLOSERS[c])
+                elif c in "]}":
+                    if c != self._stack.pop():
+                        self._stack = []
+                    elif not self._stack and self._accept(self._start, i + 1):
+                        self._pos = i + 1
+                        return True
+                i += 1
+                continue
+
+            # ---- top level: look for <think> or a JSON opener ----
+            if c == "<":
+                rest = text[i:i + len(THINK_OPEN)]
+                if rest == THINK_OPEN:
+                    self._in_think = True
+                    i += len(THINK_OPEN)
+                    continue
+                if THINK_OPEN.startswith(rest):
+                    break  # tag may be split across chunks
+            elif c in _CLOSERS:
+                self._stack = [_CLOSERS[c]]
+                self._start = i
+                self._in_string = False
+                self._escape = False
+            i += 1
+
+        self._pos = i
+        return False
+
+    def _accept(self, start: int, end: int) -> bool:
+        value = _decode(self.text[start:end])
+        if value is _INVALID:
+            return False
+        if not is_extraction_list(value):
+            return False
+        self.value = value
+        self.end = end
+        return True
@@ -0,0 +1,217 @@
+# ==========================================
+# PIPELINE METRICS (Prometheus text format)
+# Latency histograms per stage and per agent/model, token counters from
+# the agents' model usage, and debate outcome counters.  Export with
+# render_prometheus(), write_metrics_file() (config.metrics_path) or the
+# in-process HTTP endpoint start_metrics_server() (config.metrics_port).
+# No client library needed.
+# ==========================================
+
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+
+import config
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+_lock = threading.Lock()
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Iterable[Tuple[str, str]], extra: str = "") -> str:
+    parts = [f'{k}="{v}"'.replace("\n", " ") for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self.values.get(_label_key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[tuple, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with _lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                s["counts"][i] += 1
+            s["sum"] += value
+            s["count"] += 1
+
+    def count(self, **labels: Any) -> int:
+        s = self.series.get(_label_key(labels))
+        return s["count"] if s else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, s in sorted(self.series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, s["counts"]):
+                cumulative += n
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(key, le)} {s['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {s['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {s['count']}")
+        return lines
+
+
+# ---------------------
+# Pipeline metrics
+# ---------------------
+stage_seconds = Histogram("ie_stage_seconds", "Wall time per pipeline stage")
+agent_call_seconds = Histogram("ie_agent_call_seconds", "Wall time per agent run by stage, agent and model "
+                                                        "(debates: whole team run)")
+tokens = Counter("ie_tokens_total", "Model tokens per agent and model (kind=prompt|completion)")
+debates = Counter("ie_debates_total", "Debates per pipeline by outcome (started|resolved|summarizer|fallback)")
+role_tokens = Counter("ie_role_tokens_total", "Model tokens per agent role (generation profile) and model "
+                                          "(kind=prompt|completion, cache hits excluded)")
+role_calls = Counter("ie_role_calls_total", "Model calls per agent role by finish reason (length = num_predict cap hit)")
+model_switches = Counter("ie_model_switches_total", "Model affinity switches from one model to the next")
+model_load_seconds = Histogram("ie_model_load_seconds", "Model load time per host and model reported by Ollama "
+                                                        "(affinity warm-up)")
+cascade_calls = Counter("ie_cascade_total", "Cascaded extraction calls by pipeline and outcome "
+                                            "(accepted|error|parse|confidence|empty)")
+cascade_seconds = Counter("ie_cascade_seconds_total", "Time spent in cascaded extraction calls by pipeline "
+                                                      "and tier (fast|large)")
+
+REGISTRY = [stage_seconds, agent_call_seconds, tokens, debates, role_tokens, role_calls,
+            model_switches, model_load_seconds, cascade_calls, cascade_seconds]
+
+
+@contextmanager
+def stage_timer(stage: str, **labels: Any):
+    if not config.metrics_enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage=stage, **labels)
+
+
+def count_debate_outcome(pipeline: str, outcome: str) -> None:
+    """Feeds debates for conflicts that went to a debate."""
+    if outcome in ("debate", "summarizer", "fallback"):
+        debates.inc(pipeline=pipeline, outcome="started")
+        debates.inc(pipeline=pipeline, outcome="resolved" if outcome == "debate" else outcome)
+
+
+async def measured(awaitable: Awaitable, stage: str, agent: str, model: str):
+    """
+    Awaits an agent/team run, observing its latency under `stage`, `agent`
+    and `model` and adding the token usage of every message in the result
+    (per speaking agent).  Whole stages are timed with stage_timer().
+    """
+    if not config.metrics_enabled:
+        return await awaitable
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        result = await awaitable
+    except BaseException as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        agent_call_seconds.observe(elapsed, stage=stage, agent=agent, model=model, outcome=outcome)
+
+    for message in getattr(result, "messages", []):
+        usage = getattr(message, "models_usage", None)
+        if usage is not None:
+            source = getattr(message, "source", agent)
+            tokens.inc(usage.prompt_tokens, agent=source, model=model, kind="prompt")
+            tokens.inc(usage.completion_tokens, agent=source, model=model, kind="completion")
+    return result
+
+
+# ---------------------
+# Export
+# ---------------------
+def render_prometheus() -> str:
+    with _lock:
+        lines = [line for metric in REGISTRY for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: Optional[str] = None) -> None:
+    """Atomically writes the current metrics to `path` (default config.metrics_path)."""
+    path = path or config.metrics_path
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serves GET /metrics from a daemon thread (default port config.metrics_port)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port if port is not None else config.metrics_port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+def reset() -> None:
+    with _lock:
+        for metric in REGISTRY:
+            if isinstance(metric, Counter):
+                metric.values.clear()
+            else:
+                metric.series.clear()
@@ -0,0 +1,955 @@
+# ==========================================
+# MODEL CLIENT WRAPPERS
+# Every agent (extraction, debate turn, summarizer) reaches the model
+# through its ChatCompletionClient, so cross-cutting behaviour lives in
+# thin wrappers around the Ollama clients built in config.py.
+# ==========================================
+
+import json
+import time
+import asyncio
+import logging
+import weakref
+from contextvars import ContextVar
+from collections import defaultdict, deque
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelInfo,
+    RequestUsage,
+    SystemMessage,
+)
+
+import config
+import metrics
+from deadlines import LatencyTracker
+from json_extract import JsonStreamScanner
+from replay_log import ReplayLog, wire_key
+from response_cache import ResponseCache, make_key
+from structured_log import trace
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------
+# Delegating base
+# -------------------------------
+class ChatCompletionClientWrapper(ChatCompletionClient):
+    """
+    Forwards everything to `inner`.  Subclasses override create() /
+    create_stream() to add behaviour around the actual model call.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None):
+        self.inner = inner
+        self.model = model or getattr(inner, "_model_name", "unknown")
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Any] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[Any] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        return await self.inner.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Any] = [],
+        tool_choice: Any = "auto",
+        json_output: Optional[Any] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        return self.inner.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=extra_create_args,
+            cancellation_token=cancellation_token,
+        )
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.inner.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.inner.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Any] = []) -> int:
+        return self.inner.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Any] = []) -> int:
+        return self.inner.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):  # type: ignore
+        return self.inner.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.inner.model_info
+
+
+# -------------------------------
+# Per-model outstanding-call limit
+# -------------------------------
+class ModelCallLimiter:
+    """
+    One semaphore per model name, shared by every client of that model.
+    Limits come from `config.max_outstanding_calls`.
+
+    Semaphores are kept per event loop so scripts that call asyncio.run()
+    more than once do not reuse a semaphore bound to a closed loop.
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, int]] = None):
+        self.limits = limits
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def limit_for(self, model: str) -> int:
+        limits = self.limits if self.limits is not None else config.max_outstanding_calls
+        return max(1, limits.get(model, config.default_max_outstanding_calls))
+
+    def semaphore(self, model: str) -> asyncio.Semaphore:
+        per_loop = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if model not in per_loop:
+            per_loop[model] = asyncio.Semaphore(self.limit_for(model))
+        return per_loop[model]
+
+
+model_call_limiter = ModelCallLimiter()
+
+
+class LimitedChatCompletionClient(ChatCompletionClientWrapper):
+    """Holds a per-model slot from `limiter` for the duration of each call."""
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None,
+                 limiter: Optional[ModelCallLimiter] = None):
+        super().__init__(inner, model)
+        self.limiter = limiter or model_call_limiter
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        async with self.limiter.semaphore(self.model):
+            return await self.inner.create(messages, **kwargs)
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        async def _stream():
+            async with self.limiter.semaphore(self.model):
+                async for chunk in self.inner.create_stream(messages, **kwargs):
+                    yield chunk
+        return _stream()
+
+
+# -------------------------------
+# Model affinity scheduling
+# -------------------------------
+class _AffinityState:
+    def __init__(self):
+        self.active: Optional[str] = None
+        self.running = 0
+        self.batch = 0
+        self.switching = False
+        self.queues: Dict[str, Deque["asyncio.Future[None]"]] = defaultdict(deque)
+
+
+async def ollama_warm(previous: Optional[str], model: str, hosts: Optional[List[str]] = None) -> None:
+    """
+    Unloads `previous` (config.affinity_unload_previous) and loads `model`
+    with keep_alive=config.affinity_keep_alive on every host; an empty
+    /api/generate request only (un)loads the model.
+    """
+    from ollama import AsyncClient
+
+    # Load with the context size the calls will use, or the first call reloads it
+    num_ctx = next((profile.get("num_ctx") for role, profile in config.generation_profiles.items()
+                    if config.role_models.get(role) == model and profile.get("num_ctx")), None)
+
+    async def _one(url: str):
+        try:
+            # A short-lived client per switch; closing it releases its connection pool
+            async with AsyncClient(host=url) as client:
+                if previous and config.affinity_unload_previous:
+                    await client.generate(model=previous, prompt="", keep_alive=0)
+                response = await client.generate(model=model, prompt="", keep_alive=config.affinity_keep_alive,
+                                                 options={"num_ctx": num_ctx} if num_ctx else None)
+            load_seconds = (response.load_duration or 0) / 1e9
+            metrics.model_load_seconds.observe(load_seconds, host=url, model=model)
+            trace.event("model_load", host=url, model=model, previous=previous, load_ms=round(load_seconds * 1000, 2))
+            log.info("📦 Loaded %s on %s in %.2fs", model, url, load_seconds)
+        except Exception as e:
+            log.warning("⚠️ Warm-up of %s on %s failed: %s", model, url, e)
+
+    await asyncio.wait_for(asyncio.gather(*(_one(url) for url in (hosts or config.ollama_hosts))),
+                           config.agent_call_timeout)
+
+
+class ModelAffinityScheduler:
+    """
+    Admits model calls one model at a time so Ollama does not swap models
+    between interleaved requests.
+
+    - Calls for the active model start right away, up to
+      config.affinity_max_batch while calls for other models wait.
+    - Calls for other models queue per model.  Once the active model has
+      no call in flight, the model with the longest queue becomes active:
+      `warm(previous, next)` loads it, then its whole queue is released.
+
+    State is kept per event loop (see ModelCallLimiter); all hosts switch
+    together.  `switches` and `events` record every switch.
+    """
+
+    def __init__(self, warm: Optional[Callable[[Optional[str], str], Awaitable[None]]] = ollama_warm):
+        self.warm = warm
+        self._states = weakref.WeakKeyDictionary()
+        self.switches = 0
+        self.events: List[Dict[str, Any]] = []
+
+    def _state(self) -> _AffinityState:
+        loop = asyncio.get_running_loop()
+        if loop not in self._states:
+            self._states[loop] = _AffinityState()
+        return self._states[loop]
+
+    def _batch_full(self, st: _AffinityState) -> bool:
+        return config.affinity_max_batch is not None and st.batch >= config.affinity_max_batch
+
+    def _dispatch(self, st: _AffinityState) -> None:
+        if st.switching:
+            return
+        waiting = [m for m, q in st.queues.items() if q and m != st.active]
+        queue = st.queues[st.active]
+        while queue and not (waiting and self._batch_full(st)):
+            future = queue.popleft()
+            if future.done():               # caller cancelled while queued
+                continue
+            st.running += 1
+            st.batch += 1
+            future.set_result(None)
+        if st.running == 0 and waiting:
+            following = max(waiting, key=lambda m: len(st.queues[m]))
+            st.switching = True
+            asyncio.ensure_future(self._switch(st, st.active, following))
+
+    async def _switch(self, st: _AffinityState, previous: str, following: str) -> None:
+        self.switches += 1
+        queued = len(st.queues[following])
+        started = time.perf_counter()
+        log.info("🔄 Switching model %s → %s (%d queued)", previous, following, queued)
+        metrics.model_switches.inc(previous=previous, model=following)
+        try:
+            if self.warm is not None:
+                await self.warm(previous, following)
+        except Exception as e:
+            log.warning("⚠️ Loading %s failed: %r", following, e)
+        finally:
+            self.events.append({"previous": previous, "model": following, "queued": queued,
+                                "warm_seconds": round(time.perf_counter() - started, 3)})
+            st.active = following
+            st.batch = 0
+            st.switching = False
+            self._dispatch(st)
+
+    async def acquire(self, model: str) -> None:
+        st = self._state()
+        if st.active is None:
+            st.active = model
+        future = asyncio.get_running_loop().create_future()
+        st.queues[model].append(future)
+        self._dispatch(st)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()              # admitted, then cancelled before running
+            else:
+                if future in st.queues[model]:
+                    st.queues[model].remove(future)
+                self._dispatch(st)
+            raise
+
+    def release(self) -> None:
+        st = self._state()
+        st.running -= 1
+        self._dispatch(st)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"switches": self.switches, "events": list(self.events)}
+
+
+model_affinity_scheduler = ModelAffinityScheduler()
+
+
+class AffinityChatCompletionClient(ChatCompletionClientWrapper):
+    """Waits for `scheduler` to admit this model before each call."""
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None,
+                 scheduler: Optional[ModelAffinityScheduler] = None):
+        super().__init__(inner, model)
+        self.scheduler = scheduler or model_affinity_scheduler
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        await self.scheduler.acquire(self.model)
+        try:
+            return await self.inner.create(messages, **kwargs)
+        finally:
+            self.scheduler.release()
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        async def _stream():
+            await self.scheduler.acquire(self.model)
+            try:
+                async for chunk in self.inner.create_stream(messages, **kwargs):
+                    yield chunk
+            finally:
+                self.scheduler.release()
+        return _stream()
+
+
+# -------------------------------
+# Persistent response cache
+# -------------------------------
+response_cache = ResponseCache(
+    config.response_cache_path,
+    config.response_cache_max_bytes,
+    enabled=config.response_cache_enabled,
+)
+
+
+def response_cache_key(model: str, messages: Sequence[LLMMessage],
+                       json_output: Any = None, extra_create_args: Mapping[str, Any] = {}) -> str:
+    """
+    model + hash(system message) + hash(everything else the model sees).
+    For a single agent.run() the payload is the task; for a debate turn it
+    is the transcript so far.
+    """
+    system = "\n".join(m.content for m in messages if isinstance(m, SystemMessage))
+    payload = json.dumps(
+        {
+            "messages": [m.model_dump(mode="json") for m in messages if not isinstance(m, SystemMessage)],
+            "json_output": json_output if isinstance(json_output, (bool, type(None))) else repr(json_output),
+            "extra_create_args": dict(extra_create_args),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return make_key(model, system, payload)
+
+
+class CachedChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Serves repeated (model, system message, payload) calls from `cache`.
+    Only completed, non-tool responses are stored.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None):
+        super().__init__(inner, model)
+        self.cache = cache or response_cache
+
+    def _lookup(self, key: str) -> Optional[CreateResult]:
+        raw = self.cache.get(key)
+        if raw is None:
+            return None
+        result = CreateResult.model_validate_json(raw)
+        result.cached = True
+        return result
+
+    def _store(self, key: str, result: CreateResult) -> None:
+        if isinstance(result.content, str) and result.finish_reason == "stop":
+            self.cache.put(key, self.model, result.model_dump_json().encode("utf-8"))
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        if not self.cache.enabled or kwargs.get("tools"):
+            return await self.inner.create(messages, **kwargs)
+
+        key = response_cache_key(self.model, messages, kwargs.get("json_output"),
+                                 kwargs.get("extra_create_args", {}))
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+
+        result = await self.inner.create(messages, **kwargs)
+        self._store(key, result)
+        return result
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        if not self.cache.enabled or kwargs.get("tools"):
+            return self.inner.create_stream(messages, **kwargs)
+
+        async def _stream():
+            key = response_cache_key(self.model, messages, kwargs.get("json_output"),
+                                     kwargs.get("extra_create_args", {}))
+            hit = self._lookup(key)
+            if hit is not None:
+                yield hit.content
+                yield hit
+                return
+            async for chunk in self.inner.create_stream(messages, **kwargs):
+                if isinstance(chunk, CreateResult):
+                    self._store(key, chunk)
+                yield chunk
+        return _stream()
+
+
+# -------------------------------
+# Single-flight coalescing of identical calls
+# -------------------------------
+class _Flight:
+    def __init__(self, task: "asyncio.Future[CreateResult]", token: CancellationToken):
+        self.task = task
+        self.token = token
+        self.waiters = 0
+
+
+class SingleFlightChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Concurrent calls with the same response_cache_key (same model, system
+    message and payload) share one model call; every caller gets its own
+    copy of the result.  The shared call runs under its own cancellation
+    token and is only cancelled once every waiter has gone away.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None):
+        super().__init__(inner, model)
+        self._inflight: Dict[str, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _join(self, key: str, messages: Sequence[LLMMessage], kwargs: Dict[str, Any]) -> _Flight:
+        flight = self._inflight.get(key)
+        if flight is not None and not flight.task.done() \
+                and flight.task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            return flight
+
+        token = CancellationToken()
+        kwargs = dict(kwargs, cancellation_token=token)
+        flight = _Flight(asyncio.ensure_future(self.inner.create(messages, **kwargs)), token)
+        self._inflight[key] = flight
+
+        def _forget(_task, key=key, flight=flight):
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        flight.task.add_done_callback(_forget)
+        return flight
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        self.calls += 1
+        if not config.coalesce_inflight or kwargs.get("tools"):
+            return await self.inner.create(messages, **kwargs)
+
+        key = response_cache_key(self.model, messages, kwargs.get("json_output"),
+                                 kwargs.get("extra_create_args", {}))
+        flight = self._join(key, messages, kwargs)
+        flight.waiters += 1
+        waiter = asyncio.shield(flight.task)
+        caller_token = kwargs.get("cancellation_token")
+        if caller_token is not None:
+            caller_token.link_future(waiter)
+        try:
+            result = await waiter
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.token.cancel()
+                flight.task.cancel()
+        return result.model_copy(deep=True)
+
+
+# -------------------------------
+# Streaming with early termination
+# -------------------------------
+# Agent role of the current call, set by ProfiledChatCompletionClient
+call_role: ContextVar[Optional[str]] = ContextVar("call_role", default=None)
+
+
+class EarlyStopChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Serves create() by streaming from `inner` and stopping as soon as the
+    response contains a complete extraction array (see
+    json_extract.JsonStreamScanner).  Only calls of the roles in
+    config.stream_early_stop_roles are cut; debate turns and summarizers
+    always run to the end, since their decision is the last line.
+
+    Closing the stream drops the HTTP response, which makes Ollama stop
+    generating.  Anything the model would have written after the verdict
+    (more reasoning, trailing text) is never produced.  For cut-off calls
+    the prompt token count is unknown and completion tokens are counted as
+    streamed chunks.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None):
+        super().__init__(inner, model)
+        self.calls = 0
+        self.early_stops = 0
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        if kwargs.get("tools") or call_role.get() not in config.stream_early_stop_roles:
+            return await self.inner.create(messages, **kwargs)
+
+        self.calls += 1
+        scanner = JsonStreamScanner()
+        result = None
+        stream = self.inner.create_stream(messages, **kwargs)
+        try:
+            async for chunk in stream:
+                if isinstance(chunk, CreateResult):
+                    result = chunk
+                    break
+                if scanner.feed(chunk):
+                    break
+        finally:
+            await stream.aclose()
+
+        if result is not None:
+            # Ollama's stream reports single-chunk answers as an empty list
+            if not isinstance(result.content, str) or not result.content:
+                result.content = scanner.text
+            return result
+
+        self.early_stops += 1
+        # The stream was cut before Ollama's final usage chunk, so the prompt
+        # side is estimated (~4 chars per token; count_tokens() may fetch a
+        # tiktoken encoding over the network on every call)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        return CreateResult(
+            finish_reason="stop",
+            content=scanner.text[:scanner.end],
+            usage=RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=scanner.chunks),
+            cached=False,
+        )
+
+
+# -------------------------------
+# Per-call deadline + hedged retries
+# -------------------------------
+class DeadlineChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Bounds every create() by `timeout` seconds and, when hedging is on,
+    sends a duplicate request once the call has run longer than the
+    `hedge_quantile` latency of recent calls (after `hedge_min_samples`
+    successes).  The first response wins; the loser and any call that
+    misses the deadline are cancelled, which aborts their HTTP request.
+
+    Raises asyncio.TimeoutError on deadline so callers can fall back.
+    Hedged duplicates run inside the caller's per-model slot.  A call that
+    misses the deadline counts as a failure of the endpoint it was sent to
+    (see BalancedChatCompletionClient); cancelled hedge losers do not.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, model: Optional[str] = None,
+                 timeout: Optional[float] = None, hedge: bool = False,
+                 hedge_quantile: float = 0.95, hedge_min_samples: int = 20):
+        super().__init__(inner, model)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        def remaining():
+            return None if self.timeout is None else max(0.0, self.timeout - (loop.time() - started))
+
+        sent_to: Dict[asyncio.Future, List["HostEndpoint"]] = {}
+
+        def start() -> asyncio.Future:
+            token = call_endpoints.set([])
+            try:
+                task = asyncio.ensure_future(self.inner.create(messages, **kwargs))
+                sent_to[task] = call_endpoints.get()
+            finally:
+                call_endpoints.reset(token)
+            return task
+
+        primary = start()
+        pending = {primary}
+        error = None
+        try:
+            hedge_after = (
+                self.latency.quantile(self.hedge_quantile, self.hedge_min_samples)
+                if self.hedge else None
+            )
+            if hedge_after is not None and (self.timeout is None or hedge_after < self.timeout):
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    self.hedges += 1
+                    pending.add(start())
+
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.timeouts += 1
+                    for task in pending:
+                        for endpoint in sent_to[task]:
+                            endpoint.record_failure()
+                    raise asyncio.TimeoutError(f"{self.model} call exceeded {self.timeout}s")
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    self.latency.add(loop.time() - started)
+                    if task is not primary:
+                        self.hedge_wins += 1
+                    return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+# -------------------------------
+# Per-role generation profiles
+# -------------------------------
+def profile_create_args(profile: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Ollama create args for a config.generation_profiles entry (None values dropped)."""
+    return {k: v for k, v in (profile or {}).items() if v is not None}
+
+
+class ProfiledChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Adds a role's generation profile (think, num_predict, stop, num_ctx,
+    temperature) to every call on a shared model client and counts that
+    role's calls and tokens.  Explicit extra_create_args win.  The profile
+    is part of the call, so cache, coalescing and replay keys include it.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, role: str, profile: Optional[Mapping[str, Any]] = None,
+                 model: Optional[str] = None):
+        super().__init__(inner, model)
+        self.role = role
+        self.create_args = profile_create_args(profile)
+        self.calls = 0
+        self.truncated = 0
+        self._usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    def _kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(kwargs, extra_create_args={**self.create_args, **kwargs.get("extra_create_args", {})})
+
+    def _count(self, result: CreateResult) -> None:
+        # autogen reports Ollama's done_reason "length" as "unknown"
+        cap = self.create_args.get("num_predict")
+        truncated = result.finish_reason == "length" or (
+            cap is not None and cap > 0 and result.usage.completion_tokens >= cap)
+        self.calls += 1
+        self.truncated += truncated
+        metrics.role_calls.inc(role=self.role, finish_reason="length" if truncated else result.finish_reason)
+        if result.cached:
+            return
+        self._usage = _sum_usage([self._usage, result.usage])
+        metrics.role_tokens.inc(result.usage.prompt_tokens, role=self.role, model=self.model, kind="prompt")
+        metrics.role_tokens.inc(result.usage.completion_tokens, role=self.role, model=self.model, kind="completion")
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        token = call_role.set(self.role)
+        try:
+            result = await self.inner.create(messages, **self._kwargs(kwargs))
+        finally:
+            call_role.reset(token)
+        self._count(result)
+        return result
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        async def _stream():
+            async for chunk in self.inner.create_stream(messages, **self._kwargs(kwargs)):
+                if isinstance(chunk, CreateResult):
+                    self._count(chunk)
+                yield chunk
+        return _stream()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._usage
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model": self.model, "calls": self.calls, "truncated": self.truncated,
+                "prompt_tokens": self._usage.prompt_tokens, "completion_tokens": self._usage.completion_tokens}
+
+
+# -------------------------------
+# Record / replay of whole runs
+# -------------------------------
+_WIRE_ROLES = {"SystemMessage": "system", "UserMessage": "user", "AssistantMessage": "assistant",
+               "FunctionExecutionResultMessage": "tool"}
+
+
+def wire_messages(messages: Sequence[LLMMessage]) -> List[Dict[str, Any]]:
+    """Role and content of each message as the Ollama client sends them."""
+    return [{"role": _WIRE_ROLES.get(type(m).__name__, "user"),
+             "content": m.content if isinstance(m.content, str) else str(m.content)}
+            for m in messages]
+
+
+class RecordingChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Appends every completed call (key, response, usage) to `log`.  Sits
+    outermost, so it records exactly what the agents received, cache hits
+    and early-stopped responses included.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, log: ReplayLog, model: Optional[str] = None):
+        super().__init__(inner, model)
+        self.log = log
+
+    def _record(self, messages: Sequence[LLMMessage], kwargs: Dict[str, Any], result: CreateResult) -> None:
+        if not isinstance(result.content, str):
+            return
+        key = response_cache_key(self.model, messages, kwargs.get("json_output"),
+                                 kwargs.get("extra_create_args", {}))
+        self.log.record(key, self.model, result.content, result.finish_reason,
+                        result.usage.prompt_tokens, result.usage.completion_tokens,
+                        wire=wire_key(self.model, wire_messages(messages)))
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        result = await self.inner.create(messages, **kwargs)
+        self._record(messages, kwargs, result)
+        return result
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        async def _stream():
+            async for chunk in self.inner.create_stream(messages, **kwargs):
+                if isinstance(chunk, CreateResult):
+                    self._record(messages, kwargs, chunk)
+                yield chunk
+        return _stream()
+
+
+class ReplayChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Answers every call from a recorded `log` without touching `inner`
+    (kept only for model_info / token counting).  A call that was not
+    recorded raises ReplayMissError, so a replay makes no model calls.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, log: ReplayLog, model: Optional[str] = None):
+        super().__init__(inner, model)
+        self.log = log
+        self._usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    def _replay(self, messages: Sequence[LLMMessage], kwargs: Dict[str, Any]) -> CreateResult:
+        key = response_cache_key(self.model, messages, kwargs.get("json_output"),
+                                 kwargs.get("extra_create_args", {}))
+        entry = self.log.next(key)
+        usage = RequestUsage(prompt_tokens=entry["usage"][0], completion_tokens=entry["usage"][1])
+        self._usage = _sum_usage([self._usage, usage])
+        return CreateResult(finish_reason=entry["finish_reason"], content=entry["content"],
+                            usage=usage, cached=False)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        return self._replay(messages, kwargs)
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        async def _stream():
+            result = self._replay(messages, kwargs)
+            yield result.content
+            yield result
+        return _stream()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._usage
+
+
+# -------------------------------
+# Multi-host load balancing
+# -------------------------------
+class HostEndpoint:
+    """
+    One Ollama server.  Holds a client per model (each keeps its own
+    keep-alive HTTP connection pool), the number of requests in flight
+    across all models, and health state.
+    """
+
+    def __init__(self, url: str, client_factory: Callable[[str, str], ChatCompletionClient] = None):
+        self.url = url
+        self.client_factory = client_factory or config.make_ollama_client
+        self.clients: Dict[str, ChatCompletionClient] = {}
+        self.outstanding = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+
+    def client(self, model: str) -> ChatCompletionClient:
+        if model not in self.clients:
+            self.clients[model] = self.client_factory(model, self.url)
+        return self.clients[model]
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= config.host_eject_after_failures:
+            self.ejected_until = time.monotonic() + config.host_eject_seconds
+            self.failures = 0
+
+
+# Endpoints a call was sent to: set per call by DeadlineChatCompletionClient
+# and filled by BalancedChatCompletionClient, so a deadline expiry (a call
+# cancelled from above) is still counted against the host that hung.
+call_endpoints: ContextVar[Optional[List[HostEndpoint]]] = ContextVar("call_endpoints", default=None)
+
+
+class BalancedChatCompletionClient(ChatCompletionClientWrapper):
+    """
+    Sends each call to the healthy endpoint with the fewest outstanding
+    requests.  If every endpoint is ejected, the one due back first is used.
+    Cancellation is not counted as a host failure here; deadline expiries
+    are reported by DeadlineChatCompletionClient through call_endpoints.
+    A stream closed by its consumer after the first chunk (early stop)
+    counts as a success.
+    """
+
+    def __init__(self, model: str, endpoints: List[HostEndpoint]):
+        super().__init__(endpoints[0].client(model), model)
+        self.endpoints = endpoints
+
+    def pick(self) -> HostEndpoint:
+        healthy = [e for e in self.endpoints if e.healthy]
+        if not healthy:
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        return min(healthy, key=lambda e: (e.outstanding, e.requests))
+
+    @staticmethod
+    def _sent(endpoint: HostEndpoint) -> None:
+        sent = call_endpoints.get()
+        if sent is not None:
+            sent.append(endpoint)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs: Any) -> CreateResult:
+        endpoint = self.pick()
+        self._sent(endpoint)
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        try:
+            result = await endpoint.client(self.model).create(messages, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        endpoint.record_success()
+        return result
+
+    def create_stream(self, messages: Sequence[LLMMessage], **kwargs: Any):
+        async def _stream():
+            endpoint = self.pick()
+            self._sent(endpoint)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            streamed = False
+            try:
+                async for chunk in endpoint.client(self.model).create_stream(messages, **kwargs):
+                    streamed = True
+                    yield chunk
+            except GeneratorExit:
+                # Closed by the consumer (early stop once the verdict arrived):
+                # the host answered, so this is a success
+                if streamed:
+                    endpoint.record_success()
+                raise
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                endpoint.record_failure()
+                raise
+            else:
+                endpoint.record_success()
+            finally:
+                endpoint.outstanding -= 1
+        return _stream()
+
+    def actual_usage(self) -> RequestUsage:
+        return _sum_usage(e.client(self.model).actual_usage() for e in self.endpoints)
+
+    def total_usage(self) -> RequestUsage:
+        return _sum_usage(e.client(self.model).total_usage() for e in self.endpoints)
+
+
+def _sum_usage(usages) -> RequestUsage:
+    total = RequestUsage(prompt_tokens=0, completion_tokens=0)
+    for u in usages:
+        total = RequestUsage(
+            prompt_tokens=total.prompt_tokens + u.prompt_tokens,
+            completion_tokens=total.completion_tokens + u.completion_tokens,
+        )
+    return total
+
+
+class ClientRegistry:
+    """
+    Resolves agent roles ("ner", "re", "debate", "summarizer") to the
+    client of their model (config.role_models); roles on the same model
+    share one client, each behind its own generation profile
+    (config.generation_profiles).  All clients balance over the same
+    endpoints, so outstanding-request counts and host health are global.
+    `wrap` adds the usual wrapper stack (cache, limits, deadlines, ...).
+    """
+
+    def __init__(self, hosts: Optional[List[str]] = None,
+                 wrap: Optional[Callable[[ChatCompletionClient, str], ChatCompletionClient]] = None):
+        self.endpoints = [HostEndpoint(url) for url in (hosts or config.ollama_hosts)]
+        self.wrap = wrap or (lambda client, model: client)
+        self._by_role: Dict[str, ChatCompletionClient] = {}
+        self._by_model: Dict[str, ChatCompletionClient] = {}
+
+    def client_for_model(self, model: str) -> ChatCompletionClient:
+        if model not in self._by_model:
+            self._by_model[model] = self.wrap(BalancedChatCompletionClient(model, self.endpoints), model)
+        return self._by_model[model]
+
+    def client_for_role(self, role: str) -> ChatCompletionClient:
+        if role not in self._by_role:
+            model = config.role_models[role]
+            self._by_role[role] = ProfiledChatCompletionClient(
+                self.client_for_model(model), role, config.generation_profiles.get(role), model)
+        return self._by_role[role]
+
+    def role_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, num_predict truncations and tokens spent per agent role."""
+        return {role: client.stats() for role, client in self._by_role.items()}
+
+    def host_stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"host": e.url, "outstanding": e.outstanding, "requests": e.requests, "healthy": e.healthy}
+            for e in self.endpoints
+        ]
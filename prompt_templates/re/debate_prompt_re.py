@@ -29,7 +29,7 @@ STRICT RULES:
 
 FINAL JSON RULE:
 - LAST LINE ONLY contains:
-{"head": "%s", "relation": "<Kill|Live-in|Work-for|Located-in|OrgBasedIn|no_relation>", "tail": "%s"}
+{{"head": "{head}", "relation": "<Kill|Live-in|Work-for|Located-in|OrgBasedIn|no_relation>", "tail": "{tail}"}}
 
 NO text before or after the JSON object.
 
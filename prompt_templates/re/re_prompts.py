@@ -158,3 +158,43 @@ Entities: {entity_list}
 
 <bot> JSON Response:
 """
+
+
+
+# ----------------------------------------------------------
+# JOINT (ALL RELATIONS IN ONE CALL)
+# ----------------------------------------------------------
+
+JOINT_RELATION_PROMPT = """
+System Message:
+You are an advanced Relation Extraction agent for ALL of these relations:
+
+- "Kill":       <person> killed <person>
+                ("killed", "murdered", "shot", "<A> ended <B>'s life").
+- "Live-in":    <person> lives in <location>
+                ("lives in", "resides in", "<A> is from <B>", "<A>'s home is in <B>").
+- "Work-for":   <person> works for <organization>
+                ("works for", "employed by", "<A> is on the staff of <B>").
+- "Located-in": <location> is inside <location>
+                ("in", "inside", "within", "<A> lies in <B>").
+- "OrgBasedIn": <organization> is based in <location>
+                ("based in", "headquartered in", "<A> operates in <B>").
+
+Read the ENTIRE sentence and extract ALL relations of ALL five types,
+expressed literally or by meaning.
+
+STRICT RULES:
+1. Use ONLY the information inside the sentence — no world knowledge.
+2. Do NOT guess or hallucinate relations not expressed in text.
+3. The same (head, tail) pair may appear under more than one relation
+   only if the sentence really supports each of them.
+4. Output ONE JSON list; every object names its relation:
+   {"head": "<entity>", "relation": "<one of the five>", "tail": "<entity>", "confidence": 1.0}
+5. If no relation is present → output [].
+6. No explanations. No text outside JSON.
+
+Sentence: {sentence}
+Entities: {entity_list}
+
+<bot> JSON Response:
+"""
@@ -0,0 +1,122 @@
+# ==========================================
+# RECORD / REPLAY LOG
+# Every model call of a run (NER and RE extraction, each debate turn,
+# summarizers) as one compact JSON line:
+#   {"key", "wire_key", "model", "doc", "content", "finish_reason", "usage": [prompt, completion]}
+# keyed like the response cache (model + system message + payload).
+# wire_key is the same call as Ollama sees it (see wire_key()), so a
+# recording can be served by benchmarks/mock_ollama.py as well.
+# Written by model_clients.RecordingChatCompletionClient and served back by
+# model_clients.ReplayChatCompletionClient; a path ending in .gz is gzipped.
+# ==========================================
+
+import gzip
+import json
+import hashlib
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from structured_log import current_document
+
+
+def wire_key(model: str, messages: List[Dict[str, Any]]) -> str:
+    """Key of a call from the /api/chat request body: model + role and content of every message."""
+    payload = json.dumps(
+        [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(f"{model}\n{payload}".encode("utf-8")).hexdigest()
+
+
+class ReplayMissError(KeyError):
+    """A call during replay has no recorded response."""
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class ReplayLog:
+    """
+    Append-only recording (`record()`) and key-based playback (`next()`).
+
+    The same call can happen several times in a run (e.g. a debate agent
+    seeing the same transcript for two documents); playback returns the
+    recorded responses for a key in order and repeats the last one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._entries: Optional[Dict[str, Deque[Dict[str, Any]]]] = None
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    # -------------------------------
+    # Record
+    # -------------------------------
+    def record(self, key: str, model: str, content: str, finish_reason: str,
+               prompt_tokens: int, completion_tokens: int, wire: Optional[str] = None) -> None:
+        entry = {
+            "key": key,
+            "wire_key": wire,
+            "model": model,
+            "doc": current_document.get(),
+            "content": content,
+            "finish_reason": finish_reason,
+            "usage": [prompt_tokens, completion_tokens],
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = _open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    # -------------------------------
+    # Replay
+    # -------------------------------
+    def _load(self) -> Dict[str, Deque[Dict[str, Any]]]:
+        if self._entries is None:
+            entries = defaultdict(deque)
+            with _open(self.path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["key"]].append(entry)
+            self._entries = entries
+        return self._entries
+
+    def next(self, key: str) -> Dict[str, Any]:
+        """Next recorded response for `key`; raises ReplayMissError if there is none."""
+        with self._lock:
+            queue = self._load().get(key)
+            if queue:
+                entry = self._last[key] = queue.popleft()
+            elif key in self._last:
+                entry = self._last[key]
+            else:
+                self.misses += 1
+                raise ReplayMissError(f"no recorded response for call {key[:12]}… in {self.path}")
+            self.replayed += 1
+            return entry
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with _open(self.path, "r") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def stats(self) -> dict:
+        return {"path": self.path, "recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
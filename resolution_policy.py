@@ -0,0 +1,117 @@
+# ==========================================
+# CONFLICT RESOLUTION POLICY
+# Decides whether a conflict (one NER span with several types, one RE pair
+# with several relations) needs a debate at all.  A label wins outright
+# when its best confidence leads the runner-up by `min_margin`, or when
+# `min_vote_lead` more agents back it than the runner-up; only close calls
+# go to RoundRobinGroupChat.  Thresholds are read from config on each call.
+# ==========================================
+
+from typing import Any, Dict, List, Optional
+
+import config
+
+
+class PolicyStats:
+    """How each conflict of one pipeline was resolved."""
+
+    OUTCOMES = ("margin", "vote", "memo", "debate")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.conflicts = 0
+        self.outcomes = {outcome: 0 for outcome in self.OUTCOMES}
+
+    def record(self, outcome: str) -> None:
+        self.conflicts += 1
+        self.outcomes[outcome] += 1
+
+    def skipped_share(self) -> float:
+        """Share of conflicts resolved without a debate."""
+        if not self.conflicts:
+            return 0.0
+        return 1.0 - self.outcomes["debate"] / self.conflicts
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "conflicts": self.conflicts,
+            **self.outcomes,
+            "skipped_share": round(self.skipped_share(), 4),
+        }
+
+
+class ConflictPolicy:
+    """
+    Picks a winner among conflicting claims without a debate, or None.
+
+    - label_key:      claim field holding the label ("type" / "relation")
+    - config_prefix:  reads config.<prefix>_debate_skip_margin (best-confidence
+                      lead over the runner-up label) and
+                      config.<prefix>_debate_skip_vote_lead (lead in distinct
+                      claimants); None turns a rule off
+
+    The margin rule only applies when every label has a claim with a
+    confidence; a missing confidence is not read as 0.  Votes count
+    claimants, not claims: a claim's "agent" field, else its label (each
+    NER type and RE relation comes from a single agent), so one agent
+    listing a span once per mention or alias is still one vote.
+    """
+
+    def __init__(self, label_key: str, config_prefix: str):
+        self.label_key = label_key
+        self.config_prefix = config_prefix
+        self.stats = PolicyStats()
+
+    @property
+    def min_margin(self) -> Optional[float]:
+        return getattr(config, f"{self.config_prefix}_debate_skip_margin")
+
+    @property
+    def min_vote_lead(self) -> Optional[int]:
+        return getattr(config, f"{self.config_prefix}_debate_skip_vote_lead")
+
+    def decide(self, claims: List[Dict[str, Any]]):
+        """(winning claim, "margin" | "vote") or (None, None) to debate."""
+        by_label: Dict[str, List[Dict[str, Any]]] = {}
+        for claim in claims:
+            by_label.setdefault(claim[self.label_key], []).append(claim)
+        if len(by_label) < 2:
+            return None, None
+
+        min_margin, min_vote_lead = self.min_margin, self.min_vote_lead
+        if min_margin is not None:
+            best = {label: _best_confidence(group) for label, group in by_label.items()}
+            if None not in best.values():
+                ranked = sorted(best, key=best.get, reverse=True)
+                if best[ranked[0]] - best[ranked[1]] >= min_margin:
+                    return _top_claim(by_label[ranked[0]]), "margin"
+
+        if min_vote_lead is not None:
+            votes = {label: len({c.get("agent", label) for c in group}) for label, group in by_label.items()}
+            ranked = sorted(votes, key=votes.get, reverse=True)
+            if votes[ranked[0]] - votes[ranked[1]] >= min_vote_lead:
+                return _top_claim(by_label[ranked[0]]), "vote"
+
+        return None, None
+
+
+def _confidence(claim: Dict[str, Any]) -> Optional[float]:
+    try:
+        return float(claim["confidence"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _best_confidence(claims: List[Dict[str, Any]]) -> Optional[float]:
+    values = [c for c in map(_confidence, claims) if c is not None]
+    return max(values) if values else None
+
+
+def _top_claim(claims: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return max(claims, key=lambda c: _confidence(c) or 0.0)
+
+
+ner_policy = ConflictPolicy("type", "ner")
+re_policy = ConflictPolicy("relation", "re")
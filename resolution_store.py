@@ -0,0 +1,120 @@
+# ==========================================
+# DEBATE OUTCOME MEMO
+# Remembers verdicts from NER span debates and RE pair debates, keyed by
+# the normalized span (or head/tail pair) plus a compact signature of the
+# surrounding words, so the same conflict in the same kind of context is
+# not debated again.  Entries expire after a TTL; the least recently used
+# entries are dropped beyond capacity.
+# ==========================================
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import config
+
+_token_re = re.compile(r"\w+")
+
+
+def normalize_span(span: str) -> str:
+    return " ".join(_token_re.findall(span.casefold()))
+
+
+def context_signature(text: str, spans: Sequence[str], n: int = None) -> Optional[str]:
+    """
+    Lower-cased n-gram window around the first occurrence of `spans` in
+    `text`: n tokens before the first span, n after the last, and (for
+    pairs) up to 2n tokens in between.  None if a span does not occur.
+    """
+    if n is None:
+        n = config.memo_context_tokens
+    positions = []
+    for span in spans:
+        i = text.find(span)
+        if i == -1:
+            return None
+        positions.append((i, i + len(span)))
+    start = min(p[0] for p in positions)
+    end = max(p[1] for p in positions)
+
+    left = _token_re.findall(text[:start].casefold())[-n:] if n else []
+    right = _token_re.findall(text[end:].casefold())[:n] if n else []
+    parts = [" ".join(left), "|", " ".join(right)]
+
+    if len(positions) > 1:
+        first_end = min(p[1] for p in positions)
+        second_start = max(p[0] for p in positions)
+        between = _token_re.findall(text[first_end:second_start].casefold())
+        if len(between) > 2 * n:
+            between = between[:n] + ["…"] + between[-n:]
+        parts[1] = "|" + " ".join(between) + "|"
+    return " ".join(parts)
+
+
+class ResolutionStore:
+    """
+    TTL + capacity bounded map from (kind, subject, context) to a verdict.
+
+    A lookup only returns a verdict whose confidence reaches
+    `min_confidence`; callers decide whether it fits the current claims.
+    """
+
+    def __init__(self, capacity: int, ttl: float, min_confidence: float, enabled: bool = True):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.min_confidence = min_confidence
+        self.enabled = enabled
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.records = 0
+
+    def lookup(self, kind: str, subject: str, context: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not self.enabled or context is None:
+            return None
+        key = (kind, subject, context)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry["at"] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        if entry["confidence"] < self.min_confidence:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry["verdict"])
+
+    def record(self, kind: str, subject: str, context: Optional[str],
+               verdict: Dict[str, Any], confidence: float) -> None:
+        if not self.enabled or context is None:
+            return
+        key = (kind, subject, context)
+        self._entries[key] = {"verdict": dict(verdict), "confidence": confidence, "at": time.monotonic()}
+        self._entries.move_to_end(key)
+        self.records += 1
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "records": self.records,
+        }
+
+
+resolution_memo = ResolutionStore(
+    capacity=config.memo_capacity,
+    ttl=config.memo_ttl_seconds,
+    min_confidence=config.memo_min_confidence,
+    enabled=config.memo_enabled,
+)
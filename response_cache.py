@@ -0,0 +1,145 @@
+# ==========================================
+# PERSISTENT RESPONSE CACHE (SQLite)
+# Content-addressed store for model responses, keyed on
+#   model name + hash(system message) + hash(task payload)
+# with size-based LRU eviction and hit/miss counters.
+# Used by model_clients.CachedChatCompletionClient.
+# ==========================================
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+
+def make_key(model: str, system_message: str, payload: str) -> str:
+    """Content address for one model call."""
+    system_hash = hashlib.sha256(system_message.encode("utf-8")).hexdigest()
+    payload_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{model}\0{system_hash}\0{payload_hash}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed key/value cache with LRU eviction by total value size.
+
+    - The database is opened lazily on first use.
+    - `enabled = False` bypasses the cache (no reads, no writes).
+    - `stats()` returns hit/miss/write/eviction counters for this process.
+    """
+
+    def __init__(self, path: str, max_bytes: int, enabled: bool = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    # -------------------------------
+    # Connection
+    # -------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    # -------------------------------
+    # Public API
+    # -------------------------------
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, value: bytes) -> None:
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, value, len(value), time.time()),
+            )
+            self._total_bytes += len(value) - (old[0] if old else 0)
+            self.writes += 1
+            self._evict(conn)
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -------------------------------
+    # LRU eviction (oldest last_access first)
+    # -------------------------------
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
@@ -0,0 +1,240 @@
+# ==========================================
+# DOCUMENT SEGMENTATION (long inputs)
+# Splits a document into overlapping sentence windows, runs NER and RE
+# per window concurrently, maps entity spans back to document character
+# offsets and merges duplicates across windows.
+# ==========================================
+
+import re
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from rapidfuzz import fuzz
+
+import config
+from intra_group_debate_ner import run_intra_group_ner_pipeline
+from intra_group_debate_re import run_intra_group_debate_re
+
+# A terminator (plus closing quotes/brackets) ends a sentence only when
+# whitespace and an uppercase letter (or the end of the text) follow
+_boundary_re = re.compile(r"[.!?]+[\"')\]]*(?=\s+[\"'(\[]?[A-Z]|\s*$)")
+# Never a sentence end (besides the titles in config.honorific_titles)
+ABBREVIATIONS = {
+    "St.", "Mt.", "Ft.", "Jr.", "Sr.", "Inc.", "Co.", "Corp.", "Ltd.", "Bros.",
+    "Gen.", "Col.", "Lt.", "Sgt.", "Capt.", "Gov.", "Sen.", "Rep.", "Rev.",
+    "No.", "vs.", "etc.", "e.g.", "i.e.", "U.S.", "U.K.", "U.N.",
+}
+
+
+# ---------------------
+# Splitting
+# ---------------------
+def _is_abbreviation(text: str, dot: int, abbreviations: set) -> bool:
+    """True if the word ending at `text[dot] == "."` is an abbreviation or an initial."""
+    i = dot
+    while i > 0 and not text[i - 1].isspace():
+        i -= 1
+    word = text[i:dot + 1].lstrip("\"'([")
+    return word in abbreviations or (len(word) == 2 and word[0].isupper())
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """(start, end) character offsets of each sentence, whitespace trimmed."""
+    abbreviations = ABBREVIATIONS | {t for t in config.honorific_titles if t.endswith(".")}
+    cuts = [m.end() for m in _boundary_re.finditer(text)
+            if not (m.group().rstrip("\"')]") == "." and _is_abbreviation(text, m.start(), abbreviations))]
+    if not cuts or cuts[-1] < len(text):
+        cuts.append(len(text))
+
+    bounds = []
+    start = 0
+    for end in cuts:
+        s, e = start, end
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s < e:
+            bounds.append((s, e))
+        start = end
+    return bounds
+
+
+def build_windows(text: str, sentences: int = None, overlap: int = None) -> List[Dict[str, Any]]:
+    """
+    Groups consecutive sentences into windows of `sentences` sentences,
+    consecutive windows sharing `overlap` sentences.
+    Each window: {"start", "end", "text"} with document offsets.
+    """
+    if sentences is None:
+        sentences = config.window_sentences
+    if overlap is None:
+        overlap = config.window_overlap
+    sentences = max(1, sentences)
+    step = max(1, sentences - max(0, overlap))
+
+    bounds = split_sentences(text)
+    if not bounds:
+        return []
+
+    windows = []
+    for i in range(0, len(bounds), step):
+        chunk = bounds[i:i + sentences]
+        start, end = chunk[0][0], chunk[-1][1]
+        windows.append({"start": start, "end": end, "text": text[start:end]})
+        if i + sentences >= len(bounds):
+            break
+    return windows
+
+
+# ---------------------
+# Offset remapping
+# ---------------------
+def locate_mentions(span: str, window: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """Document offsets of every occurrence of `span` inside `window`."""
+    found = []
+    text = window["text"]
+    i = text.find(span)
+    while i != -1:
+        found.append((window["start"] + i, window["start"] + i + len(span)))
+        i = text.find(span, i + 1)
+    return found
+
+
+# ---------------------
+# Cross-window merging
+# ---------------------
+def _span_text(value: Any) -> Optional[str]:
+    """A span as text: numbers become strings, other non-strings and blanks None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    return value if isinstance(value, str) and value.strip() else None
+
+
+def _confidence(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def merge_window_entities(window_entities: List[List[Dict[str, Any]]], windows: List[Dict[str, Any]],
+                          threshold: float = None):
+    """
+    Merges entities found in several windows into document entities.
+
+    Spans of the same type are merged when they are equal ignoring case or
+    their rapidfuzz ratio reaches `threshold` (default
+    config.window_merge_threshold).  The first-seen spelling becomes the
+    canonical span; the others are kept as aliases.
+
+    Returns (entities, alias_map) where alias_map maps every raw span to
+    its canonical span.
+    """
+    if threshold is None:
+        threshold = config.window_merge_threshold
+
+    merged: List[Dict[str, Any]] = []
+    alias_map: Dict[str, str] = {}
+
+    for window, entities in zip(windows, window_entities):
+        for ent in entities:
+            span = _span_text(ent.get("span")) if isinstance(ent, dict) else None
+            if span is None:
+                continue
+            ent = dict(ent, span=span)
+            key = span.casefold()
+
+            target = None
+            for cand in merged:
+                if cand.get("type") != ent.get("type"):
+                    continue
+                if cand["_key"] == key or fuzz.ratio(cand["_key"], key) >= threshold:
+                    target = cand
+                    break
+
+            mentions = locate_mentions(span, window)
+            if target is None:
+                target = dict(ent)
+                target["_key"] = key
+                target["aliases"] = []
+                target["mentions"] = []
+                merged.append(target)
+            else:
+                if span != target["span"] and span not in target["aliases"]:
+                    target["aliases"].append(span)
+                conf = _confidence(ent.get("confidence"))
+                if conf > _confidence(target.get("confidence")):
+                    target["confidence"] = conf
+
+            aliases = ent.get("aliases")
+            for alias in aliases if isinstance(aliases, list) else []:
+                alias = _span_text(alias)
+                if alias is None:
+                    continue
+                if alias != target["span"] and alias not in target["aliases"]:
+                    target["aliases"].append(alias)
+                mentions += locate_mentions(alias, window)
+                alias_map[alias] = target["span"]
+            for m in mentions:
+                if list(m) not in target["mentions"]:
+                    target["mentions"].append(list(m))
+            alias_map[span] = target["span"]
+
+    for ent in merged:
+        del ent["_key"]
+        ent["mentions"].sort()
+        if ent["mentions"]:
+            ent["start"], ent["end"] = ent["mentions"][0]
+    return merged, alias_map
+
+
+def merge_window_relations(window_relations: List[List[Dict[str, Any]]], alias_map: Dict[str, str]):
+    """Canonicalizes head/tail spans and keeps one triple per (head, tail, relation)."""
+    best: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for relations in window_relations:
+        for rel in relations:
+            if not isinstance(rel, dict):
+                continue
+            head, tail = _span_text(rel.get("head")), _span_text(rel.get("tail"))
+            if head is None or tail is None or not isinstance(rel.get("relation"), str):
+                continue
+            rel = dict(rel)
+            rel["head"] = alias_map.get(head, head)
+            rel["tail"] = alias_map.get(tail, tail)
+            key = (rel["head"], rel["tail"], rel["relation"])
+            if key not in best or _confidence(rel.get("confidence")) > _confidence(best[key].get("confidence")):
+                best[key] = rel
+    return list(best.values())
+
+
+# ---------------------
+# Segmented pipeline
+# ---------------------
+async def run_segmented_pipeline(text: str, sentences: int = None, overlap: int = None,
+                                 ner=run_intra_group_ner_pipeline):
+    """
+    NER → RE over overlapping sentence windows.  Windows run concurrently,
+    each going straight from its NER into its RE.  `ner` lets callers put a
+    pre-pass (e.g. the gazetteer fast path) in front of window NER.
+
+    Returns (entities, relations): entities carry document offsets
+    ("start", "end", "mentions") and "aliases"; relations use canonical
+    entity spans.
+    """
+    windows = build_windows(text, sentences, overlap)
+    if not windows:
+        return [], []
+
+    async def run_window(window):
+        ents = await ner(window["text"])
+        rels = await run_intra_group_debate_re(window["text"], ents)
+        return ents, rels
+
+    results = await asyncio.gather(*(run_window(w) for w in windows))
+    window_entities = [ents for ents, _ in results]
+    window_relations = [rels for _, rels in results]
+
+    entities, alias_map = merge_window_entities(window_entities, windows)
+    relations = merge_window_relations(window_relations, alias_map)
+    return entities, relations
@@ -0,0 +1,114 @@
+# ==========================================
+# SPAN NORMALIZATION & CLUSTERING (NER → RE)
+# NER claims are grouped by exact span, so "Officer Arjun", "Arjun" and
+# "arjun" would each be resolved (and paired in RE) on their own.  This
+# stage normalizes spans (case, honorific titles, leading articles),
+# scores all pairs at once with rapidfuzz process.cdist and merges
+# near-duplicates into one canonical span with aliases before conflict
+# resolution.
+# ==========================================
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from rapidfuzz import fuzz, process
+
+import config
+
+_space_re = re.compile(r"\s+")
+_articles = ("the ", "a ", "an ")
+
+
+def normalize_surface(span: str) -> str:
+    """Casefolded span without a leading title/article or punctuation at the edges."""
+    text = _space_re.sub(" ", span).strip()
+    for title in sorted(config.honorific_titles, key=len, reverse=True):
+        if text.startswith(title + " "):
+            text = text[len(title) + 1:]
+            break
+    text = text.casefold()
+    for article in _articles:
+        if text.startswith(article):
+            text = text[len(article):]
+            break
+    return text.strip(" .,;:'\"()[]")
+
+
+def cluster_spans(spans: List[str], threshold: float = None) -> List[List[int]]:
+    """
+    Indices of `spans` grouped into clusters of near-duplicates: spans whose
+    normalized forms have a fuzz.ratio of at least `threshold` (default
+    config.span_merge_threshold) end up together, transitively.
+    """
+    if threshold is None:
+        threshold = config.span_merge_threshold
+    if not spans:
+        return []
+
+    norms = [normalize_surface(s) for s in spans]
+    scores = process.cdist(norms, norms, scorer=fuzz.ratio, score_cutoff=threshold, workers=-1)
+
+    parent = list(range(len(spans)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*scores.nonzero()):
+        if i < j and norms[i] and norms[j]:
+            parent[find(j)] = find(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(spans)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def cluster_span_map(span_map: Dict[str, List[Dict[str, Any]]], threshold: float = None
+                     ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[str]]]:
+    """
+    Merges the claims of near-duplicate spans under one canonical span: the
+    spelling claimed most often, then the shortest, then the first seen.
+
+    Returns (merged span_map, {canonical span: [aliases]}); claims are
+    rewritten to the canonical span.
+    """
+    spans = list(span_map)
+    merged: Dict[str, List[Dict[str, Any]]] = {}
+    aliases: Dict[str, List[str]] = {}
+
+    for cluster in cluster_spans(spans, threshold):
+        members = [spans[i] for i in cluster]
+        counts = Counter({s: len(span_map[s]) for s in members})
+        canonical = max(members, key=lambda s: (counts[s], -len(s)))
+
+        claims = []
+        for span in members:
+            for claim in span_map[span]:
+                claim = dict(claim)
+                claim["span"] = canonical
+                claims.append(claim)
+        merged[canonical] = claims
+        others = [s for s in members if s != canonical]
+        if others:
+            aliases[canonical] = others
+    return merged, aliases
+
+
+def attach_aliases(entities: List[Dict[str, Any]], aliases: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    for ent in entities:
+        if isinstance(ent, dict) and ent.get("span") in aliases:
+            ent["aliases"] = list(aliases[ent["span"]])
+    return entities
+
+
+def alias_map_from_entities(entities: List[Dict[str, Any]]) -> Dict[str, str]:
+    """{alias: canonical span} for entities carrying "aliases"."""
+    return {
+        alias: ent["span"]
+        for ent in entities if isinstance(ent, dict) and ent.get("span")
+        for alias in ent.get("aliases", [])
+    }
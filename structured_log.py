@@ -0,0 +1,129 @@
+# ==========================================
+# STRUCTURED LOGGING & JSONL TRACE
+# Each module logs through logging.getLogger(__name__) (per-stage loggers:
+# intra_group_debate_ner, intra_group_debate_re, gazetteer, corpus, ...).
+# Messages use %-style arguments and large payloads are wrapped in
+# LazyJson, so nothing is formatted or serialized for a disabled level.
+#
+# The optional trace (config.trace_path) writes one JSON object per line
+# for every agent call, debate and verdict, tagged with the document
+# being processed and its duration.
+# ==========================================
+
+import json
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Optional
+
+import config
+
+# Document index set by corpus.process_document; inherited by its tasks
+current_document: contextvars.ContextVar = contextvars.ContextVar("current_document", default=None)
+
+
+class LazyJson:
+    """Serializes `obj` only when the log record is actually formatted."""
+
+    __slots__ = ("obj", "indent")
+
+    def __init__(self, obj: Any, indent: Optional[int] = 2):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.obj, indent=self.indent, ensure_ascii=False, default=str)
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, doc, msg (+ exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "doc": current_document.get(),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: str = None, fmt: str = None) -> None:
+    """
+    Root handler for scripts (library code never calls this).
+    level: config.log_level; fmt: config.log_format ("text" or "json").
+    """
+    handler = logging.StreamHandler()
+    if (fmt or config.log_format) == "json":
+        handler.setFormatter(JsonLineFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=(level or config.log_level).upper(), handlers=[handler], force=True)
+
+
+# ---------------------
+# JSONL trace
+# ---------------------
+class TraceWriter:
+    """Appends trace events to `path` (None = tracing off)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def event(self, event: str, **fields: Any) -> None:
+        if self.path is None:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        entry = {"ts": round(time.time(), 6), "doc": current_document.get(), "event": event, **fields}
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    @contextmanager
+    def timed(self, event: str, **fields: Any):
+        """
+        Records `event` with duration_ms (and error, if any) on exit.
+        The yielded dict can be filled with more fields, e.g. the verdict.
+        """
+        if self.path is None:
+            yield fields
+            return
+        started = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.event(event, duration_ms=round((time.perf_counter() - started) * 1000, 2), **fields)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+trace = TraceWriter(config.trace_path)
+
+
+async def traced(awaitable: Awaitable, event: str, **fields: Any):
+    """Awaits `awaitable` inside trace.timed(event, **fields)."""
+    with trace.timed(event, **fields) as entry:
+        result = await awaitable
+        messages = getattr(result, "messages", None)
+        if messages is not None:
+            entry["messages"] = len(messages)
+        return result
+
+
+def trace_verdict(kind: str, subject: str, outcome: str, verdict: Optional[Dict[str, Any]]) -> None:
+    trace.event("verdict", kind=kind, subject=subject, outcome=outcome, verdict=verdict)
@@ -0,0 +1,93 @@
+# ==========================================
+# AGENT CONTEXT GROWTH
+# Per-call agents (create_agents.new_agent) must send a prompt that does
+# not grow with the number of calls or documents already processed.
+# Runs offline: a replay model client for single agents, the mock Ollama
+# server (benchmarks/mock_ollama.py) for whole pipeline runs.
+# ==========================================
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import config
+import create_agents
+from mock_ollama import MockOllamaServer
+from synthetic_corpus import generate_corpus
+
+TASK = "Arjun lives in Maple Town and works for BrightTech."
+ANSWER = '[{"span": "Arjun", "confidence": 1.0}]'
+
+
+class CountingServer(MockOllamaServer):
+    """Mock Ollama that remembers how many messages each request carried."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.message_counts = []
+
+    def answer(self, model, messages):
+        with self.lock:
+            self.message_counts.append(len(messages))
+        return super().answer(model, messages)
+
+
+@pytest.fixture
+def mock_ollama(monkeypatch):
+    server = CountingServer(median_ms=1, sigma=0, malformed=0, seed=0).start()
+    server.responder.conflict_density = 0.3
+    monkeypatch.setattr(config, "ollama_hosts", [server.url])
+    monkeypatch.setattr(config, "host", server.url)
+    monkeypatch.setattr(config, "response_cache_enabled", False)
+    monkeypatch.setattr(config, "memo_enabled", False)
+    monkeypatch.setattr(config, "trace_path", None)
+    monkeypatch.setattr(create_agents, "_client_registry", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def _run_agent(calls: int, fresh: bool):
+    from autogen_ext.models.replay import ReplayChatCompletionClient
+
+    client = ReplayChatCompletionClient([ANSWER] * calls)
+    shared = create_agents.new_agent("PER", model_client=client)
+    for _ in range(calls):
+        agent = create_agents.new_agent("PER", model_client=client) if fresh else shared
+        await agent.run(task=TASK)
+    return [len(call["messages"]) for call in client.create_calls]
+
+
+def test_fresh_agent_message_count_is_flat():
+    counts = asyncio.run(_run_agent(50, fresh=True))
+    assert set(counts) == {counts[0]}
+
+
+def test_reused_agent_message_count_grows():
+    counts = asyncio.run(_run_agent(5, fresh=False))
+    assert counts == sorted(counts) and counts[-1] > counts[0]
+
+
+def test_pipeline_message_count_is_bounded(mock_ollama):
+    async def run(docs):
+        from intra_group_debate_ner import run_intra_group_ner_pipeline
+        from intra_group_debate_re import run_intra_group_debate_re
+
+        per_doc = []
+        for text in docs:
+            start = len(mock_ollama.message_counts)
+            ents = await run_intra_group_ner_pipeline(text)
+            await run_intra_group_debate_re(text, ents)
+            per_doc.append(max(mock_ollama.message_counts[start:]))
+        return per_doc
+
+    per_doc = asyncio.run(run(generate_corpus(12, 4, seed=0)))
+    # system message + task + one message per earlier debate turn
+    bound = 2 + config.debate_max_turns
+    assert max(per_doc) <= bound, per_doc